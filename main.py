@@ -64,6 +64,9 @@ async def shutdown_event():
     
     # Event system removed - no cleanup needed
     
+    # Close pooled database connections
+    await db_manager.close()
+    
     logger.info("Server shutdown complete")
 
 if __name__ == "__main__":
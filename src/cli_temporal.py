@@ -259,6 +259,7 @@ def main(server_url, session, new_session, show_history, message, no_streaming,
             # Cleanup
             if client.temporal_client:
                 await temporal_client.disconnect()
+            await db_manager.close()
     
     # Show startup banner
     console.print(Panel.fit(
@@ -32,8 +32,9 @@ class DatabaseSettings(BaseModel):
     """Database configuration settings"""
     url: str = Field(default="sqlite:///./chat_sessions.db")
     echo: bool = Field(default=False)
-    pool_size: int = Field(default=5)
+    pool_size: int = Field(default=8)
     max_overflow: int = Field(default=10)
+    busy_timeout_ms: int = Field(default=5000)
 
 
 class OpenRouterSettings(BaseModel):
@@ -109,8 +110,9 @@ class Settings(BaseModel):
             "database": {
                 "url": os.getenv("DATABASE_URL", "sqlite:///./chat_sessions.db"),
                 "echo": os.getenv("DATABASE_ECHO", "false").lower() == "true",
-                "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "5")),
+                "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "8")),
                 "max_overflow": int(os.getenv("DATABASE_MAX_OVERFLOW", "10")),
+                "busy_timeout_ms": int(os.getenv("DATABASE_BUSY_TIMEOUT_MS", "5000")),
             },
             "openrouter": {
                 "api_key": get_config_value("openrouter_api_key"),
@@ -2,10 +2,12 @@
 Database manager for chat sessions and messages with optimized JSON structure
 """
 import aiosqlite
+import asyncio
 import json
 import logging
+import orjson
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from uuid import uuid4
 from contextlib import asynccontextmanager
 from collections import OrderedDict
@@ -15,7 +17,7 @@ from src.models.chat import ChatSession, ChatMessage, ChatSessionCreate, ChatMes
 from src.models.session_state import (
     SessionToolStateData, SessionConfiguration, ModelCapabilityInfo, 
     ToolAvailabilityInfo, ModelCapabilityLevel, SessionToolState,
-    session_state_manager
+    TOOL_STATE_VALUES, CAPABILITY_LEVEL_VALUES, session_state_manager
 )
 
 logger = logging.getLogger(__name__)
@@ -25,12 +27,18 @@ class DatabaseManager:
     
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        # Idle connections kept open between calls so each connection's
+        # compiled statement cache survives; bound to the event loop using them
+        self._idle_connections: List[aiosqlite.Connection] = []
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
         
     async def initialize(self):
         """Initialize database with updated schema"""
         async with aiosqlite.connect(self.db_path) as db:
             # Enable foreign keys
             await db.execute("PRAGMA foreign_keys = ON")
+            # WAL lets readers proceed while a writer commits; the mode is stored in the file
+            await db.execute("PRAGMA journal_mode = WAL")
             
             # Create sessions table with optimized structure
             await db.execute("""
@@ -72,26 +80,81 @@ class DatabaseManager:
                 )
             """)
             
+            # Supports the inactive-session scan (status + updated_at range)
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_archival ON sessions(status, updated_at)"
+            )
+            
             await db.commit()
             logger.info("Database initialized with optimized schema")
 
+    async def _acquire_connection(self) -> aiosqlite.Connection:
+        """Take an idle pooled connection or open a new one"""
+        loop = asyncio.get_running_loop()
+        if self._pool_loop is not loop:
+            # Connections opened on another event loop are not reused here; close them
+            # so their worker threads and file handles are released
+            stale, self._idle_connections = self._idle_connections, []
+            self._pool_loop = loop
+            for conn in stale:
+                try:
+                    await conn.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close database connection from a previous event loop: {e}")
+        
+        if self._idle_connections:
+            return self._idle_connections.pop()
+        
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA foreign_keys = ON")
+        # Under WAL, NORMAL trades durability of the last commits for fsync savings:
+        # a power loss or OS crash can lose them, though the database stays consistent
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        # Wait on a locked database instead of failing
+        await conn.execute(f"PRAGMA busy_timeout = {int(settings.database.busy_timeout_ms)}")
+        return conn
+
+    async def _release_connection(self, conn: aiosqlite.Connection) -> None:
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            if len(self._idle_connections) < settings.database.pool_size:
+                self._idle_connections.append(conn)
+                return
+        except Exception as e:
+            logger.warning(f"Dropping pooled database connection: {e}")
+        await conn.close()
+
+    async def close(self) -> None:
+        """Close all idle pooled connections"""
+        idle, self._idle_connections = self._idle_connections, []
+        for conn in idle:
+            await conn.close()
+
     @asynccontextmanager
     async def get_connection(self):
-        """Get database connection with proper error handling"""
+        """Get a pooled database connection with proper error handling
+        
+        Connections are reused across calls, so SQLite's per-connection
+        statement cache skips re-parsing the same queries.
+        """
         conn = None
         try:
-            conn = await aiosqlite.connect(self.db_path)
-            conn.row_factory = aiosqlite.Row
-            await conn.execute("PRAGMA foreign_keys = ON")
+            conn = await self._acquire_connection()
             yield conn
         except Exception as e:
             if conn:
-                await conn.rollback()
+                try:
+                    await conn.rollback()
+                except Exception as rollback_error:
+                    logger.warning(f"Rollback after database error failed: {rollback_error}")
             logger.error(f"Database error: {e}")
             raise
         finally:
             if conn:
-                await conn.close()
+                await self._release_connection(conn)
 
     async def create_session(self, session_data: ChatSessionCreate) -> ChatSession:
         """Create a new chat session with optimized structure"""
@@ -306,13 +369,119 @@ class DatabaseManager:
             logger.error(f"Failed to get conversation history: {e}")
             raise
 
+    async def get_turn_count(self, session_id: str) -> int:
+        """Count conversation turns for a session without loading the history"""
+        try:
+            async with self.get_connection() as db:
+                cursor = await db.execute(
+                    "SELECT json_array_length(conversation_history, '$.conversation_turns') FROM sessions WHERE session_id = ?",
+                    (session_id,)
+                )
+                row = await cursor.fetchone()
+                
+                if not row or row[0] is None:
+                    return 0
+                
+                return row[0]
+                
+        except Exception as e:
+            logger.error(f"Failed to count conversation turns: {e}")
+            raise
+
+    async def get_recent_turns(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Last `limit` conversation turns in chronological order, without loading the full history"""
+        try:
+            async with self.get_connection() as db:
+                cursor = await db.execute(
+                    """SELECT turn.value
+                       FROM sessions, json_each(sessions.conversation_history, '$.conversation_turns') AS turn
+                       WHERE sessions.session_id = ?
+                       ORDER BY turn.key DESC
+                       LIMIT ?""",
+                    (session_id, limit)
+                )
+                rows = await cursor.fetchall()
+                
+                return [json.loads(row[0]) for row in reversed(rows)]
+                
+        except Exception as e:
+            logger.error(f"Failed to get recent turns: {e}")
+            raise
+
+    async def get_recent_message_stats(self, session_id: str, limit: int = 10) -> Tuple[int, float]:
+        """Count and average length of the messages in the last turns, computed in SQL.
+
+        Each turn contributes its user message and its first active assistant response.
+        """
+        try:
+            async with self.get_connection() as db:
+                cursor = await db.execute(
+                    """WITH recent_turns AS (
+                           SELECT turn.value AS turn
+                           FROM sessions, json_each(sessions.conversation_history, '$.conversation_turns') AS turn
+                           WHERE sessions.session_id = ?
+                           ORDER BY turn.key DESC
+                           LIMIT ?
+                       ),
+                       first_responses AS (
+                           SELECT (
+                               SELECT response.value
+                               FROM json_each(recent_turns.turn, '$.assistant_responses') AS response
+                               WHERE CASE WHEN json_type(response.value, '$.is_active') IS NULL THEN 1
+                                          ELSE json_extract(response.value, '$.is_active') END
+                               ORDER BY response.key
+                               LIMIT 1
+                           ) AS response
+                           FROM recent_turns
+                       ),
+                       lengths AS (
+                           SELECT coalesce(length(json_extract(turn, '$.user_message.content')), 0) AS length
+                           FROM recent_turns
+                           WHERE json_type(turn, '$.user_message') IS NOT NULL
+                           UNION ALL
+                           SELECT coalesce(length(json_extract(response, '$.content')), 0)
+                           FROM first_responses
+                           WHERE response IS NOT NULL
+                       )
+                       SELECT COUNT(*), coalesce(AVG(length), 0.0) FROM lengths""",
+                    (session_id, limit)
+                )
+                row = await cursor.fetchone()
+                
+                if not row:
+                    return 0, 0.0
+                
+                return row[0], float(row[1])
+                
+        except Exception as e:
+            logger.error(f"Failed to get recent message stats: {e}")
+            raise
+
+    async def is_session_inactive_since(self, session_id: str, threshold: datetime) -> Optional[bool]:
+        """Whether a session was last updated before threshold; None if the session does not exist"""
+        try:
+            async with self.get_connection() as db:
+                cursor = await db.execute(
+                    "SELECT updated_at IS NOT NULL AND updated_at < ? FROM sessions WHERE session_id = ?",
+                    (threshold.isoformat(), session_id)
+                )
+                row = await cursor.fetchone()
+                
+                if not row:
+                    return None
+                
+                return bool(row[0])
+                
+        except Exception as e:
+            logger.error(f"Failed to check session inactivity: {e}")
+            raise
+
     async def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Get session information by ID"""
         try:
             async with self.get_connection() as db:
                 cursor = await db.execute(
-                    """SELECT session_id, name, status, created_at, updated_at, 
-                              session_data, conversation_history 
+                    """SELECT session_id, name, status, created_at, updated_at, session_data
                        FROM sessions WHERE session_id = ?""",
                     (session_id,)
                 )
@@ -338,9 +507,8 @@ class DatabaseManager:
                         updated_at = datetime.utcnow()
                 
                 # Parse session data and get metadata
-                session_data = json.loads(row['session_data']) if row['session_data'] else {}
+                session_data = orjson.loads(row['session_data']) if row['session_data'] else {}
                 metadata = session_data.get('metadata', {})
-                conversation = json.loads(row['conversation_history']) if row['conversation_history'] else {"conversation_turns": []}
                 message_count = metadata.get('total_messages', 0)
                 
                 return ChatSession(
@@ -357,16 +525,38 @@ class DatabaseManager:
             logger.error(f"Failed to get session: {e}")
             raise
 
-    async def list_sessions(self, limit: int = 50, offset: int = 0) -> List[ChatSession]:
-        """List sessions with pagination"""
+    async def list_sessions(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        status: Optional[SessionStatus] = None,
+        updated_before: Optional[datetime] = None,
+        min_message_count: Optional[int] = None
+    ) -> List[ChatSession]:
+        """List sessions with pagination and optional server-side filters"""
         try:
+            conditions = []
+            params: List[Any] = []
+            if status is not None:
+                conditions.append("status = ?")
+                params.append(status.value)
+            if updated_before is not None:
+                # Timestamps are stored as ISO strings, which sort chronologically
+                conditions.append("updated_at < ?")
+                params.append(updated_before.isoformat())
+            if min_message_count is not None:
+                conditions.append("json_extract(session_data, '$.metadata.total_messages') >= ?")
+                params.append(min_message_count)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
             async with self.get_connection() as db:
                 cursor = await db.execute(
-                    """SELECT session_id, name, status, created_at, updated_at, session_data
+                    f"""SELECT session_id, name, status, created_at, updated_at, session_data
                        FROM sessions 
+                       {where}
                        ORDER BY updated_at DESC 
                        LIMIT ? OFFSET ?""",
-                    (limit, offset)
+                    (*params, limit, offset)
                 )
                 
                 sessions = []
@@ -388,7 +578,7 @@ class DatabaseManager:
                             updated_at = datetime.utcnow()
                     
                     # Parse session data and get metadata
-                    session_data = json.loads(row['session_data']) if row['session_data'] else {}
+                    session_data = orjson.loads(row['session_data']) if row['session_data'] else {}
                     metadata = session_data.get('metadata', {})
                     
                     sessions.append(ChatSession(
@@ -407,6 +597,45 @@ class DatabaseManager:
             logger.error(f"Failed to list sessions: {e}")
             raise
 
+    async def list_sessions_for_archival(self, cutoff: datetime, limit: int) -> List[str]:
+        """IDs of active sessions with messages last updated before cutoff, oldest first"""
+        try:
+            async with self.get_connection() as db:
+                cursor = await db.execute(
+                    """SELECT session_id FROM sessions
+                       WHERE status = 'active' AND updated_at < ?
+                         AND json_extract(session_data, '$.metadata.total_messages') > 0
+                       ORDER BY updated_at ASC
+                       LIMIT ?""",
+                    (cutoff.isoformat(), limit)
+                )
+                return [row[0] for row in await cursor.fetchall()]
+                
+        except Exception as e:
+            logger.error(f"Failed to list sessions for archival: {e}")
+            raise
+
+    async def bulk_update_session_status(self, session_ids: List[str], status: SessionStatus) -> int:
+        """Set the status of many sessions in a single UPDATE statement"""
+        if not session_ids:
+            return 0
+
+        try:
+            placeholders = ",".join("?" * len(session_ids))
+            async with self.get_connection() as db:
+                # Take the write lock up front so the update never has to upgrade a read lock
+                await db.execute("BEGIN IMMEDIATE")
+                cursor = await db.execute(
+                    f"UPDATE sessions SET status = ?, updated_at = ? WHERE session_id IN ({placeholders})",
+                    (status.value, datetime.utcnow().isoformat(), *session_ids)
+                )
+                await db.commit()
+                return cursor.rowcount
+
+        except Exception as e:
+            logger.error(f"Failed to bulk update session status: {e}")
+            raise
+
     # Legacy compatibility method - DISABLED for pure JSON conversation_turns approach
     async def add_message(self, session_id: str, message_data: ChatMessageCreate) -> ChatMessage:
         """
@@ -420,11 +649,11 @@ class DatabaseManager:
     async def get_session_context(self, session_id: str, limit: int = 10) -> Dict[str, Any]:
         """Get recent conversation context for AI processing"""
         try:
-            conversation = await self.get_conversation_history(session_id)
-            turns = conversation.get('conversation_turns', [])
-            
-            # Get last N turns
-            recent_turns = turns[-limit:] if len(turns) > limit else turns
+            # Only the last N turns are loaded; the total is counted in SQL
+            recent_turns, total_turns = await asyncio.gather(
+                self.get_recent_turns(session_id, limit),
+                self.get_turn_count(session_id)
+            )
             
             # Format for AI context
             context_messages = []
@@ -450,7 +679,7 @@ class DatabaseManager:
             return {
                 "session_id": session_id,
                 "messages": context_messages,
-                "total_turns": len(turns),
+                "total_turns": total_turns,
                 "context_turns": len(recent_turns)
             }
             
@@ -730,7 +959,7 @@ class DatabaseManager:
                 # Update session state section
                 session_data['session_state'] = {
                     "current_model": tool_state.current_model,
-                    "model_capability_level": tool_state.model_info.capability_level.value,
+                    "model_capability_level": CAPABILITY_LEVEL_VALUES[tool_state.model_info.capability_level],
                     "supports_tool_calls": tool_state.model_info.supports_tool_calls,
                     "available_tools": tool_state.get_available_tools(),
                     "session_configuration": {
@@ -750,7 +979,7 @@ class DatabaseManager:
                     },
                     "tool_availability": {
                         tool_name: {
-                            "state": info.state.value,
+                            "state": TOOL_STATE_VALUES[info.state],
                             "last_checked": info.last_checked.isoformat(),
                             "cache_expiry": info.cache_expiry.isoformat() if info.cache_expiry else None,
                             "error_message": info.error_message,
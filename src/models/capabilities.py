@@ -39,6 +39,11 @@ class ModelCapabilityManager:
         self._capability_cache: Dict[str, ModelCapability] = {}
         self._cache_ttl = timedelta(hours=24)  # Cache for 24 hours
         self._last_cache_update: Optional[datetime] = None
+        # Cache misses waiting on the next batched lookup (model_id -> result future)
+        self._pending_capability_loads: Dict[str, asyncio.Future] = {}
+        self._capability_load_task: Optional[asyncio.Task] = None
+        # Serializes stale-cache reloads when the manager is shared across activities
+        self._cache_lock = asyncio.Lock()
     
     @property
     def db_manager(self):
@@ -78,40 +83,27 @@ class ModelCapabilityManager:
             logger.error(f"Failed to load capabilities cache: {e}")
             raise
     
+    def _is_cache_stale(self) -> bool:
+        return (self._last_cache_update is None or 
+                datetime.utcnow() - self._last_cache_update > self._cache_ttl)
+    
     async def _refresh_cache_if_needed(self):
         """Refresh cache if it's stale"""
-        if (self._last_cache_update is None or 
-            datetime.utcnow() - self._last_cache_update > self._cache_ttl):
-            await self._load_capabilities_cache()
+        if self._is_cache_stale():
+            async with self._cache_lock:
+                # Another caller may have reloaded it while we waited
+                if self._is_cache_stale():
+                    await self._load_capabilities_cache()
     
     async def supports_tool_calls(self, model_id: str) -> bool:
         """Check if a specific model supports tool calling"""
-        try:
-            await self._refresh_cache_if_needed()
-            
-            capability = self._capability_cache.get(model_id)
-            if capability:
-                return capability.supports_tool_calls
-            
-            # If not in cache, check database directly
-            async with self.db_manager.get_connection() as db:
-                cursor = await db.execute(
-                    "SELECT is_tool_call FROM models WHERE id = ?",
-                    (model_id,)
-                )
-                row = await cursor.fetchone()
-                
-                if row:
-                    supports = bool(row['is_tool_call'])
-                    logger.info(f"Model {model_id} tool calling support: {supports}")
-                    return supports
-                else:
-                    logger.warning(f"Model {model_id} not found in database")
-                    return False
-                    
-        except Exception as e:
-            logger.error(f"Failed to check tool calling support for {model_id}: {e}")
-            return False
+        # Shares the capability cache and the batched lookup for cache misses
+        capability = await self.get_model_capability(model_id)
+        if capability:
+            return capability.supports_tool_calls
+        
+        logger.warning(f"Model {model_id} not found in database")
+        return False
     
     async def get_tool_capable_models(self) -> List[ModelCapability]:
         """Get all models that support tool calling"""
@@ -156,30 +148,54 @@ class ModelCapabilityManager:
             if capability:
                 return capability
             
-            # Check database if not in cache
-            async with self.db_manager.get_connection() as db:
-                cursor = await db.execute(
-                    "SELECT * FROM models WHERE id = ?",
-                    (model_id,)
-                )
-                row = await cursor.fetchone()
-                
-                if row:
-                    return ModelCapability(
-                        model_id=row['id'],
-                        name=row['name'],
-                        supports_tool_calls=bool(row['is_tool_call']),
-                        context_length=row['context_length'] if row['context_length'] is not None else 0,
-                        created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                        updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
-                    )
-                else:
-                    return None
+            # Check database if not in cache; concurrent misses share one query
+            future = self._pending_capability_loads.get(model_id)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = self._pending_capability_loads[model_id] = loop.create_future()
+                if len(self._pending_capability_loads) == 1:
+                    self._capability_load_task = loop.create_task(self._load_pending_capabilities())
+            # Shielded so one cancelled caller does not cancel the lookup for the others
+            return await asyncio.shield(future)
                     
         except Exception as e:
             logger.error(f"Failed to get model capability for {model_id}: {e}")
             return None
     
+    async def _load_pending_capabilities(self):
+        """Resolve all pending cache misses with a single IN query"""
+        # Yield once so lookups issued in the same tick join this batch
+        await asyncio.sleep(0)
+        pending = self._pending_capability_loads
+        self._pending_capability_loads = {}
+        
+        try:
+            async with self.db_manager.get_connection() as db:
+                placeholders = ", ".join("?" * len(pending))
+                cursor = await db.execute(
+                    f"SELECT * FROM models WHERE id IN ({placeholders})",
+                    tuple(pending)
+                )
+                rows = {row['id']: row for row in await cursor.fetchall()}
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for model_id, future in pending.items():
+            if future.done():
+                continue
+            row = rows.get(model_id)
+            future.set_result(ModelCapability(
+                model_id=row['id'],
+                name=row['name'],
+                supports_tool_calls=bool(row['is_tool_call']),
+                context_length=row['context_length'] if row['context_length'] is not None else 0,
+                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+                updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
+            ) if row else None)
+    
     async def refresh_capabilities_from_openrouter(self, api_key: Optional[str] = None) -> Dict[str, Any]:
         """Fetch and update model capabilities from OpenRouter API"""
         if not api_key:
@@ -393,8 +409,11 @@ async def get_capability_manager() -> ModelCapabilityManager:
     """Get or create the global capability manager instance"""
     global _capability_manager
     if _capability_manager is None:
-        _capability_manager = ModelCapabilityManager()
-        await _capability_manager.initialize()
+        manager = ModelCapabilityManager()
+        await manager.initialize()
+        # A concurrent first call may have finished first; keep a single shared instance
+        if _capability_manager is None:
+            _capability_manager = manager
     return _capability_manager
 
 
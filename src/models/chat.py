@@ -2,7 +2,8 @@
 Data models for chat sessions and messages
 """
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Tuple, Union
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum
@@ -152,6 +153,11 @@ class ChatSession(BaseModel):
     
     class Config:
         use_enum_values = True
+    
+    @cached_property
+    def metadata_keys(self) -> Tuple[str, ...]:
+        """Metadata keys, computed once per session object"""
+        return tuple(self.metadata) if self.metadata else ()
 
 
 class ChatContext(BaseModel):
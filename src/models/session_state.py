@@ -31,7 +31,14 @@ class ModelCapabilityLevel(str, Enum):
     EXPERT = "expert"       # Expert level with tool chaining and complex workflows
 
 
-@dataclass
+# Serialized values by member; a dict lookup is cheaper than the Enum.value descriptor
+TOOL_STATE_VALUES: Dict[SessionToolState, str] = {state: state.value for state in SessionToolState}
+CAPABILITY_LEVEL_VALUES: Dict[ModelCapabilityLevel, str] = {level: level.value for level in ModelCapabilityLevel}
+
+_AVAILABLE_STATES = frozenset((SessionToolState.AVAILABLE, SessionToolState.CACHED))
+
+
+@dataclass(slots=True)
 class ToolAvailabilityInfo:
     """Information about tool availability for a session"""
     tool_name: str
@@ -47,7 +54,7 @@ class ToolAvailabilityInfo:
     
     def is_available(self) -> bool:
         """Check if tool is currently available"""
-        return self.state in [SessionToolState.AVAILABLE, SessionToolState.CACHED]
+        return self.state in _AVAILABLE_STATES
     
     def is_expired(self) -> bool:
         """Check if cached tool availability has expired"""
@@ -60,6 +67,28 @@ class ToolAvailabilityInfo:
         if self.execution_count == 0:
             return 0.0
         return (self.success_count / self.execution_count) * 100
+    
+    def to_public_dict(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Serialize availability details for API responses
+        
+        Args:
+            now: Reference time for the expiry check, so callers serializing
+                many tools can take a single clock reading
+        """
+        cache_expiry = self.cache_expiry
+        execution_count = self.execution_count
+        return {
+            "state": TOOL_STATE_VALUES[self.state],
+            "is_available": self.state in _AVAILABLE_STATES,
+            "is_expired": cache_expiry is not None and (now or datetime.utcnow()) > cache_expiry,
+            "last_checked": self.last_checked.isoformat(),
+            "cache_expiry": cache_expiry.isoformat() if cache_expiry else None,
+            "error_message": self.error_message,
+            "execution_count": execution_count,
+            "success_count": self.success_count,
+            "success_rate": (self.success_count / execution_count) * 100 if execution_count else 0.0,
+            "average_execution_time_ms": self.average_execution_time_ms
+        }
 
 
 @dataclass
@@ -140,20 +169,38 @@ class SessionToolStateData:
     cache_misses: int = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Memoized get_available_tools() result, valid until the earliest expiry among its tools
+    _available_tools_cache: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _available_tools_valid_until: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Initialize session configuration with correct session_id"""
         if self.session_config.session_id != self.session_id:
             self.session_config.session_id = self.session_id
     
+    def invalidate_available_tools(self) -> None:
+        """Drop the memoized available tools after availability or configuration changes"""
+        self._available_tools_cache = None
+    
     def get_available_tools(self) -> List[str]:
         """Get list of currently available tools"""
+        now = datetime.utcnow()
+        if self._available_tools_cache is not None and (
+                self._available_tools_valid_until is None or now <= self._available_tools_valid_until):
+            return list(self._available_tools_cache)
+        
         available = []
+        valid_until = None
         for tool_name, info in self.tool_availability.items():
-            if info.is_available() and not info.is_expired():
+            if info.is_available() and not (info.cache_expiry is not None and now > info.cache_expiry):
                 if self.session_config.is_tool_allowed(tool_name):
                     available.append(tool_name)
-        return available
+                    if info.cache_expiry is not None and (valid_until is None or info.cache_expiry < valid_until):
+                        valid_until = info.cache_expiry
+        
+        self._available_tools_cache = available
+        self._available_tools_valid_until = valid_until
+        return list(available)
     
     def get_tool_info(self, tool_name: str) -> Optional[ToolAvailabilityInfo]:
         """Get availability info for a specific tool"""
@@ -167,6 +214,8 @@ class SessionToolStateData:
         else:
             self.failed_tool_calls += 1
         
+        now = datetime.utcnow()
+        
         # Update tool-specific stats
         if tool_name in self.tool_availability:
             info = self.tool_availability[tool_name]
@@ -185,9 +234,9 @@ class SessionToolStateData:
                     (1 - alpha) * info.average_execution_time_ms
                 )
             
-            info.last_execution_time = datetime.utcnow()
+            info.last_execution_time = now
         
-        self.updated_at = datetime.utcnow()
+        self.updated_at = now
     
     def get_success_rate(self) -> float:
         """Get overall session tool success rate"""
@@ -221,6 +270,14 @@ class SessionToolStateData:
         self.updated_at = datetime.utcnow()
 
 
+@dataclass
+class CleanupStats:
+    """Outcome of a session state cleanup pass"""
+    cleaned_sessions: int
+    remaining_sessions: int
+    active_sessions: int
+
+
 class SessionStateManager:
     """Manages session states for tool availability and model capabilities"""
     
@@ -267,17 +324,19 @@ class SessionStateManager:
                 return None
             
             # Record model change
+            now = datetime.utcnow()
             old_model = state.current_model
             state.current_model = new_model_id
             state.model_info = new_model_info
-            state.last_model_change = datetime.utcnow()
+            state.last_model_change = now
             state.model_switch_count += 1
-            state.updated_at = datetime.utcnow()
+            state.updated_at = now
             
             # Invalidate tool availability cache since model changed
             for tool_info in state.tool_availability.values():
                 tool_info.state = SessionToolState.EXPIRED
-                tool_info.last_checked = datetime.utcnow()
+                tool_info.last_checked = now
+            state.invalidate_available_tools()
             
             logger.info(f"Updated model for session {session_id}: {old_model} → {new_model_id}")
             return state
@@ -295,24 +354,57 @@ class SessionStateManager:
                 return False
             
             cache_duration = cache_duration or self.default_cache_duration
+            now = datetime.utcnow()
             
             # Create or update tool availability info
             if tool_name not in state.tool_availability:
                 state.tool_availability[tool_name] = ToolAvailabilityInfo(
                     tool_name=tool_name,
                     state=SessionToolState.LOADING,
-                    last_checked=datetime.utcnow()
+                    last_checked=now
                 )
             
             info = state.tool_availability[tool_name]
             info.state = SessionToolState.AVAILABLE if is_available else SessionToolState.UNAVAILABLE
-            info.last_checked = datetime.utcnow()
-            info.cache_expiry = datetime.utcnow() + cache_duration
+            info.last_checked = now
+            info.cache_expiry = now + cache_duration
             info.error_message = error_message
             
-            state.updated_at = datetime.utcnow()
+            state.invalidate_available_tools()
+            state.updated_at = now
             return True
     
+    async def bulk_update_tool_availability(self,
+                                          session_id: str,
+                                          items: Dict[str, Tuple[bool, Optional[str]]],
+                                          cache_duration: Optional[timedelta] = None) -> int:
+        """Update availability for several tools under a single lock acquisition"""
+        async with self._lock:
+            state = self._session_states.get(session_id)
+            if not state:
+                return 0
+            
+            now = datetime.utcnow()
+            cache_expiry = now + (cache_duration or self.default_cache_duration)
+            
+            for tool_name, (is_available, error_message) in items.items():
+                info = state.tool_availability.get(tool_name)
+                if info is None:
+                    info = state.tool_availability[tool_name] = ToolAvailabilityInfo(
+                        tool_name=tool_name,
+                        state=SessionToolState.LOADING,
+                        last_checked=now
+                    )
+                
+                info.state = SessionToolState.AVAILABLE if is_available else SessionToolState.UNAVAILABLE
+                info.last_checked = now
+                info.cache_expiry = cache_expiry
+                info.error_message = error_message
+            
+            state.invalidate_available_tools()
+            state.updated_at = now
+            return len(items)
+    
     async def update_session_configuration(self, 
                                          session_id: str, 
                                          config: SessionConfiguration) -> bool:
@@ -323,40 +415,51 @@ class SessionStateManager:
                 return False
             
             config.session_id = session_id
-            config.updated_at = datetime.utcnow()
+            config.updated_at = state.updated_at = datetime.utcnow()
             state.session_config = config
-            state.updated_at = datetime.utcnow()
+            state.invalidate_available_tools()
             return True
     
     async def record_tool_execution(self, 
                                   session_id: str, 
                                   tool_name: str,
                                   success: bool,
-                                  execution_time_ms: float) -> bool:
-        """Record a tool execution for analytics"""
+                                  execution_time_ms: float) -> Optional[SessionToolStateData]:
+        """Record a tool execution for analytics and return the updated state"""
         async with self._lock:
             state = self._session_states.get(session_id)
             if not state:
-                return False
+                return None
             
             state.add_tool_execution(tool_name, success, execution_time_ms)
-            return True
+            return state
     
-    async def cleanup_expired_sessions(self, max_age_hours: int = 24) -> int:
+    async def cleanup_expired_sessions(self, max_age_hours: int = 24) -> CleanupStats:
         """Clean up expired session states"""
         async with self._lock:
-            cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
-            expired_sessions = [
-                session_id for session_id, state in self._session_states.items()
-                if state.updated_at < cutoff_time
-            ]
+            now = datetime.utcnow()
+            cutoff_time = now - timedelta(hours=max_age_hours)
+            active_cutoff = now - timedelta(hours=1)
+            
+            # Single pass: collect expired sessions and count active survivors
+            expired_sessions = []
+            active_sessions = 0
+            for session_id, state in self._session_states.items():
+                if state.updated_at < cutoff_time:
+                    expired_sessions.append(session_id)
+                elif state.updated_at > active_cutoff:
+                    active_sessions += 1
             
             for session_id in expired_sessions:
                 del self._session_states[session_id]
             
-            self.last_cleanup = datetime.utcnow()
+            self.last_cleanup = now
             logger.info(f"Cleaned up {len(expired_sessions)} expired session states")
-            return len(expired_sessions)
+            return CleanupStats(
+                cleaned_sessions=len(expired_sessions),
+                remaining_sessions=len(self._session_states),
+                active_sessions=active_sessions
+            )
     
     async def get_session_statistics(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get comprehensive session statistics"""
@@ -370,7 +473,7 @@ class SessionStateManager:
             return {
                 "session_id": session_id,
                 "current_model": state.current_model,
-                "model_capability_level": state.model_info.capability_level.value,
+                "model_capability_level": CAPABILITY_LEVEL_VALUES[state.model_info.capability_level],
                 "supports_tool_calls": state.model_info.supports_tool_calls,
                 "available_tools_count": len(available_tools),
                 "available_tools": available_tools,
@@ -396,8 +499,9 @@ class SessionStateManager:
         """Get statistics for all active sessions"""
         async with self._lock:
             total_sessions = len(self._session_states)
+            active_cutoff = datetime.utcnow() - timedelta(hours=1)
             active_sessions = sum(1 for state in self._session_states.values() 
-                                if (datetime.utcnow() - state.updated_at).total_seconds() < 3600)
+                                if state.updated_at > active_cutoff)
             
             total_tool_calls = sum(state.total_tool_calls for state in self._session_states.values())
             total_successful = sum(state.successful_tool_calls for state in self._session_states.values())
@@ -455,9 +559,15 @@ async def update_tool_availability_for_session(session_id: str,
     return await session_state_manager.update_tool_availability(session_id, tool_name, is_available, error_message)
 
 
+async def update_tool_availability_bulk_for_session(session_id: str,
+                                                   items: Dict[str, Tuple[bool, Optional[str]]]) -> int:
+    """Update availability for several tools in one call"""
+    return await session_state_manager.bulk_update_tool_availability(session_id, items)
+
+
 async def record_session_tool_execution(session_id: str, 
                                        tool_name: str,
                                        success: bool,
-                                       execution_time_ms: float) -> bool:
+                                       execution_time_ms: float) -> Optional[SessionToolStateData]:
     """Record tool execution for session"""
     return await session_state_manager.record_tool_execution(session_id, tool_name, success, execution_time_ms) 
\ No newline at end of file
@@ -10,7 +10,7 @@ from uuid import uuid4
 from temporalio import activity
 
 from src.database.manager import db_manager
-from src.models.chat import ChatMessageCreate, MessageRole
+from src.models.chat import ChatMessageCreate, ChatSessionCreate, MessageRole
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +23,6 @@ class DatabaseActivities:
     async def create_session(name: Optional[str] = None) -> Dict[str, Any]:
         """Create a new chat session"""
         try:
-            from src.models.chat import ChatSessionCreate
-            
             session_data = ChatSessionCreate(name=name)
             session = await db_manager.create_session(session_data)
             
@@ -7,21 +7,64 @@ Enhanced for tool calling support.
 """
 
 import time
-import json
+import copy
+import asyncio
+import contextvars
+import hashlib
 import httpx
-from typing import Dict, Any, List, Optional, AsyncGenerator
+import orjson
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Callable, Set
+from collections import OrderedDict
+from functools import cached_property
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, timezone
 from temporalio import activity
 from src.config.settings import settings
 
 
 class OpenRouterError(Exception):
-    """Custom exception for OpenRouter API errors"""
-    def __init__(self, message: str, status_code: Optional[int] = None):
-        self.message = message
+    """
+    Custom exception for OpenRouter API errors
+    
+    For HTTP error responses the body is only decoded when the error is
+    rendered, and at most MAX_BODY_BYTES of it are included.
+    """
+    MAX_BODY_BYTES = 4096
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response: Optional[httpx.Response] = None,
+        raw_body: Optional[bytes] = None
+    ):
+        self._message = message
         self.status_code = status_code
-        super().__init__(self.message)
+        self.response = response
+        self._raw_body = raw_body
+        super().__init__(message)
+    
+    @cached_property
+    def body(self) -> str:
+        """Decoded (and truncated) error response body"""
+        raw = self._raw_body
+        if raw is None and self.response is not None:
+            try:
+                raw = self.response.content
+            except httpx.ResponseNotRead:
+                raw = None
+        if not raw:
+            return ""
+        return raw[:self.MAX_BODY_BYTES].decode("utf-8", errors="replace")
+    
+    @property
+    def message(self) -> str:
+        if self.status_code is None or (self.response is None and self._raw_body is None):
+            return self._message
+        return f"{self._message}: {self.status_code} - {self.body}"
+    
+    def __str__(self) -> str:
+        return self.message
 
 
 class ToolCallError(Exception):
@@ -32,84 +75,613 @@ class ToolCallError(Exception):
         super().__init__(self.message)
 
 
+HTTP_REFERER = "https://github.com/your-app/obelisk"  # Optional
+APP_TITLE = "Obelisk Chat Server"  # Optional
+
+# (api_key, base_url) -> (headers, chat completions URL); rebuilt when either changes
+_request_target_cache: Optional[Tuple[str, str, Dict[str, str], str]] = None
+
+
+def _request_target() -> Tuple[Dict[str, str], str]:
+    """
+    Return the OpenRouter request headers and chat completions URL
+    
+    Both are cached and only rebuilt when the API key or base URL changes
+    (e.g. after settings.refresh_from_database() picks up a rotated key).
+    """
+    global _request_target_cache
+    openrouter_settings = settings.openrouter
+    api_key = openrouter_settings.api_key
+    base_url = openrouter_settings.base_url
+    cached = _request_target_cache
+    if cached is None or cached[0] != api_key or cached[1] != base_url:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": HTTP_REFERER,
+            "X-Title": APP_TITLE
+        }
+        cached = _request_target_cache = (api_key, base_url, headers, f"{base_url}/chat/completions")
+    return cached[2], cached[3]
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """
+    Return the shared OpenRouter HTTP client, creating it on first use
+    
+    Reusing one keep-alive pool avoids a TCP/TLS handshake on every call.
+    Per-request timeouts are still taken from settings at call time.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.openrouter.timeout,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+            http2=True
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared OpenRouter HTTP client (called on worker shutdown)"""
+    global _http_client, _http_client_loop
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
+
+EVENTS_URL = "http://localhost:8001/events/emit"
+_JSON_HEADERS = {"Content-Type": "application/json"}
+EVENT_QUEUE_MAXSIZE = 1000
+TOOL_EVENT_INTERVAL = 0.05  # seconds between ToolCallsStreaming events (20Hz)
+TIMESTAMP_REFRESH_CHUNKS = 32  # content chunks between created_at refreshes
+
+EVENT_RETRY_INTERVAL = 30.0  # seconds to skip emission after the event server fails
+
+_event_queue: Optional[asyncio.Queue] = None
+_event_emitter_task: Optional[asyncio.Task] = None
+_event_emitter_alive = True
+_last_fail_time = 0.0
+
+
+def _event_server_suppressed() -> bool:
+    """
+    Circuit breaker for the local event server
+    
+    After a failed post, events are skipped for EVENT_RETRY_INTERVAL seconds;
+    the first event after that window probes the server again.
+    """
+    if _event_emitter_alive:
+        return False
+    return time.monotonic() - _last_fail_time < EVENT_RETRY_INTERVAL
+
+
+def _emit_event(event: Dict[str, Any]) -> None:
+    """
+    Queue an event for the local event server without blocking the caller
+    
+    Event emission is optional: when the queue is full, or the event server
+    recently failed, the event is dropped.
+    """
+    global _event_queue, _event_emitter_task
+    if _event_server_suppressed():
+        return
+    
+    loop = asyncio.get_running_loop()
+    if _event_emitter_task is None or _event_emitter_task.done() or _event_emitter_task.get_loop() is not loop:
+        _event_queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
+        _event_emitter_task = loop.create_task(_drain_events(_event_queue))
+    
+    try:
+        _event_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass  # Drop under backpressure rather than stall the stream
+
+
+def _emit_lazy_event(build_event: Callable[[], Dict[str, Any]]) -> None:
+    """Build and queue an expensive event only when the event server is reachable"""
+    if _event_server_suppressed():
+        return
+    _emit_event(build_event())
+
+
+async def _drain_events(queue: asyncio.Queue) -> None:
+    """
+    Post queued events to the local event server
+    
+    Events are posted one at a time so that streamed chunks keep their order.
+    """
+    global _event_emitter_alive, _last_fail_time
+    while True:
+        event = await queue.get()
+        if _event_server_suppressed():
+            continue  # Drop events queued before the server went away
+        try:
+            client = await _get_client()
+            await client.post(EVENTS_URL, content=orjson.dumps(event), headers=_JSON_HEADERS, timeout=1.0)
+            _event_emitter_alive = True
+        except Exception:
+            # Event emission is optional; stop trying for a while
+            _event_emitter_alive = False
+            _last_fail_time = time.monotonic()
+
+
+# The space after the field name is optional in SSE; data is stripped after the prefix
+_SSE_DATA = b"data:"
+_SSE_DATA_LEN = len(_SSE_DATA)
+_SSE_DONE = b"[DONE]"
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[bytes]:
+    """
+    Yield the data payload of each server-sent event in a streaming response
+    
+    Works on raw network chunks as they arrive instead of decoding them to
+    text first. CRLF and CR line endings are treated as LF, comment and
+    non-data lines are skipped and iteration stops at the [DONE] sentinel.
+    """
+    buffer = bytearray()
+    # No chunk_size here: httpx would hold data back until a full chunk is buffered
+    async for chunk in response.aiter_bytes():
+        if b"\r" in chunk:
+            # A CRLF split across chunks becomes an extra blank line, which is skipped
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            if buffer.startswith(_SSE_DATA, start, end):
+                data = bytes(buffer[start + _SSE_DATA_LEN:end]).strip()
+                if data == _SSE_DONE:
+                    return
+                if data:
+                    yield data
+            start = end + 1
+        del buffer[:start]
+    
+    # A final line may arrive without a trailing newline
+    if buffer.startswith(_SSE_DATA):
+        data = bytes(buffer[_SSE_DATA_LEN:]).strip()
+        if data and data != _SSE_DONE:
+            yield data
+
+
+def _mk_event(
+    event: str,
+    content: Any,
+    run_id: str,
+    session_id: str,
+    created_at: int,
+    **fields: Any
+) -> Dict[str, Any]:
+    """
+    Build an event for the local event server
+    
+    Only the fields consumers read are always present; optional fields are
+    added when they carry a value.
+    """
+    event_data = {
+        "event": event,
+        "content": content,
+        "run_id": run_id,
+        "session_id": session_id,
+        "created_at": created_at
+    }
+    for key, value in fields.items():
+        if value is not None:
+            event_data[key] = value
+    return event_data
+
+
+def _tool_deltas_event(
+    deltas: List[Dict[str, Any]],
+    run_id: str,
+    session_id: str,
+    created_at: int
+) -> Dict[str, Any]:
+    """Build a ToolCallsStreaming event carrying only the deltas since the last one"""
+    return _mk_event(
+        "ToolCallsStreaming", "Tool calls being constructed", run_id, session_id, created_at,
+        tool_call_deltas=deltas
+    )
+
+
+RESPONSE_CACHE_MAXSIZE = 4096
+
+# LRU of deterministic (temperature=0) chat completion responses
+_response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _response_cache_key(payload: Dict[str, Any]) -> str:
+    """Cache key over everything that determines a deterministic completion"""
+    key_fields = {
+        "model": payload["model"],
+        "messages": payload["messages"],
+        "temperature": payload["temperature"],
+        "max_tokens": payload["max_tokens"],
+        "tools": payload.get("tools"),
+        "tool_choice": payload.get("tool_choice")
+    }
+    return hashlib.blake2b(
+        orjson.dumps(key_fields, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    ).hexdigest()
+
+
+def _response_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Return a private copy of a cached response, if any"""
+    cached = _response_cache.get(key)
+    if cached is None:
+        return None
+    _response_cache.move_to_end(key)
+    return copy.deepcopy(cached)
+
+
+def _response_cache_put(key: str, response_data: Dict[str, Any]) -> None:
+    """Store a copy of a response, evicting the least recently used entry"""
+    _response_cache[key] = copy.deepcopy(response_data)
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > RESPONSE_CACHE_MAXSIZE:
+        _response_cache.popitem(last=False)
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time as a naive ISO string (same format as utcnow().isoformat())"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+_PARSE_FAILED = object()
+
+
+def _loads_or_sentinel(raw: str) -> Tuple[Any, Optional[orjson.JSONDecodeError]]:
+    """Parse a JSON string without raising; bad input gives (_PARSE_FAILED, the decode error)"""
+    try:
+        return orjson.loads(raw), None
+    except orjson.JSONDecodeError as e:
+        return _PARSE_FAILED, e
+
+
+def _argument_parse_error(
+    call_index: int,
+    tool_name: str,
+    raw_arguments: str,
+    error: orjson.JSONDecodeError
+) -> Dict[str, Any]:
+    """Build the validation error for tool call arguments that are not valid JSON"""
+    return {
+        "call_index": call_index,
+        "tool_name": tool_name,
+        "error": f"Failed to parse arguments JSON: {error}",
+        "raw_arguments": raw_arguments
+    }
+
+
+def _tool_result_message(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a tool execution result into a `tool` role conversation message"""
+    if not result.get("success", True) and result.get("error"):
+        # Report the failure to the model instead of the (empty) result
+        content = orjson.dumps({"error": result["error"], "success": False}).decode()
+    elif result.get("result"):
+        content = orjson.dumps(result["result"], option=orjson.OPT_NON_STR_KEYS).decode()
+    else:
+        content = ""
+    
+    return {
+        "role": "tool",
+        "tool_call_id": result.get("call_id", result.get("tool_call_id")),
+        "name": result.get("tool_name", "unknown"),
+        "content": content
+    }
+
+
+MODELS_CACHE_TTL = 300.0  # seconds; the OpenRouter model list changes on the order of hours
+
+# (base_url, fetched_at monotonic, models) of the last /models response
+_models_cache: Optional[Tuple[str, float, List[Dict[str, Any]]]] = None
+_models_lock = asyncio.Lock()
+
+HEALTH_CHECK_TTL = 5.0  # seconds a health check result is reused
+
+_health_inflight: Optional[asyncio.Task] = None
+_health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+
+async def _probe_health() -> Dict[str, Any]:
+    """Probe OpenRouter /models once and report API availability"""
+    try:
+        headers, _ = _request_target()
+        
+        # Simple request to check API availability
+        client = await _get_client()
+        response = await client.get(
+            f"{settings.openrouter.base_url}/models",
+            headers=headers,
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return {
+                "status": "healthy",
+                "api_available": True,
+                "model": settings.openrouter.model,
+                "timestamp": time.time()
+            }
+        else:
+            return {
+                "status": "unhealthy",
+                "api_available": False,
+                "error": f"HTTP {response.status_code}",
+                "timestamp": time.time()
+            }
+            
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "api_available": False,
+            "error": str(e),
+            "timestamp": time.time()
+        }
+
+
+# Continuations never carry tool definitions, so they cannot start another tool round
+_CONTINUATION_DROPPED_KEYS = frozenset(("tools", "tool_choice"))
+
+
+def _build_continuation_request(
+    model: str,
+    request_options: Optional[Dict[str, Any]],
+    messages: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Build a continuation request from request options, without tool fields"""
+    request = {
+        key: value for key, value in (request_options or {}).items()
+        if key not in _CONTINUATION_DROPPED_KEYS
+    }
+    request.setdefault("model", model)
+    request.setdefault("messages", messages)
+    return request
+
+
+def _build_chat_payload(
+    request_data: Dict[str, Any],
+    stream: bool,
+    tools: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Build the OpenRouter chat completion payload from a request dict
+    
+    Request fields are read once here; model, temperature and max_tokens fall
+    back to the configured OpenRouter defaults. Explicit `tools` take
+    precedence over any tools in the request.
+    """
+    openrouter_settings = settings.openrouter
+    get = request_data.get
+    payload = {
+        # Use model from request, fallback to settings
+        "model": get("model", openrouter_settings.model),
+        "messages": request_data["messages"],
+        "temperature": get("temperature", openrouter_settings.temperature),
+        "max_tokens": get("max_tokens", openrouter_settings.max_tokens),
+        "stream": stream
+    }
+    
+    # Add tool definitions if provided; let the model decide when to use them
+    if tools is None:
+        tools = get("tools")
+    if tools:
+        payload["tools"] = tools
+        payload["tool_choice"] = get("tool_choice", "auto")
+    
+    return payload
+
+
+class _CompletionBatcher:
+    """
+    Micro-batcher for chat completions
+    
+    Requests submitted within a short window are coalesced and dispatched
+    together through OpenRouterActivities._run_batch; each caller awaits its
+    own future.
+    """
+    
+    def __init__(self, window_seconds: float = 0.01, max_batch_size: int = 16):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # The loop only holds weak references to tasks; in-flight batches are kept here
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a chat completion request and wait for its response"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            # A fresh context, so the long-lived collector does not keep the first
+            # submitting activity's context (activity.info, activity.logger)
+            self._task = loop.create_task(self._collect(), context=contextvars.Context())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((request_data, future))
+        return await future
+    
+    async def _collect(self) -> None:
+        """Gather arrivals within the batching window and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window_seconds
+            
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Stopped mid-window; requests already taken off the queue would never resolve
+                for _, future in batch:
+                    future.cancel()
+                raise
+            
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+    
+    async def close(self) -> None:
+        """Stop collecting, cancel undispatched requests and wait for in-flight batches"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+        
+        if self._dispatch_tasks:
+            await asyncio.gather(*self._dispatch_tasks, return_exceptions=True)
+    
+    @staticmethod
+    async def _dispatch(batch: List[Any]) -> None:
+        """Run one coalesced batch and resolve the waiting futures"""
+        try:
+            results = await OpenRouterActivities._run_batch(
+                [request for request, _ in batch], return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_completion_batcher = _CompletionBatcher()
+
+
+async def submit_chat_completion(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Submit a chat completion through the shared micro-batcher
+    
+    Requests arriving within ~10ms of each other are dispatched as one batch.
+    """
+    return await _completion_batcher.submit(request_data)
+
+
+async def close_completion_batcher() -> None:
+    """Stop the shared chat completion micro-batcher (called on worker shutdown)"""
+    await _completion_batcher.close()
+
+
 class OpenRouterActivities:
     """OpenRouter activity implementations for Temporal workflows"""
     
     @staticmethod
     @activity.defn
-    async def chat_completion(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def chat_completion(
+        request_data: Dict[str, Any],
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Non-streaming chat completion with OpenRouter API
         Enhanced with tool calling support
+        
+        Args:
+            request_data: Chat request (messages, model, temperature, ...)
+            tools: Tool definitions; overrides request_data["tools"] when given
         """
-        start_time = time.time()
+        choices = await OpenRouterActivities._chat_completion_choices(request_data, tools=tools)
+        return choices[0]
+
+    @staticmethod
+    async def _chat_completion_choices(
+        request_data: Dict[str, Any],
+        n: int = 1,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform a non-streaming chat completion and return one response per choice
+
+        With n > 1 the same prompt is sampled n times in a single API call.
+        """
+        start_time = time.monotonic()
 
         try:
             # Refresh settings to ensure we have the latest API key
             settings.refresh_from_database()
 
             # Prepare request
-            headers = {
-                "Authorization": f"Bearer {settings.openrouter.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/your-app/obelisk",  # Optional
-                "X-Title": "Obelisk Chat Server"  # Optional
-            }
+            headers, completions_url = _request_target()
             
-            # Use model from request, fallback to settings
-            model = request_data.get("model", settings.openrouter.model)
+            payload = _build_chat_payload(request_data, stream=False, tools=tools)
+            model = payload["model"]
+            if n > 1:
+                payload["n"] = n
             
-            payload = {
-                "model": model,
-                "messages": request_data["messages"],
-                "temperature": request_data.get("temperature", settings.openrouter.temperature),
-                "max_tokens": request_data.get("max_tokens", settings.openrouter.max_tokens),
-                "stream": False
-            }
+            # Deterministic requests are answered from the response cache
+            cache_key = None
+            if n == 1 and payload["temperature"] == 0:
+                cache_key = _response_cache_key(payload)
+                cached = _response_cache_get(cache_key)
+                if cached is not None:
+                    cached["response_time_ms"] = (time.monotonic() - start_time) * 1000
+                    activity.logger.info(f"OpenRouter response cache hit for model: {model}")
+                    return [cached]
             
-            # Add tool definitions if provided
-            if "tools" in request_data and request_data["tools"]:
-                payload["tools"] = request_data["tools"]
-                # Force tool calling if tools are available
-                if "tool_choice" in request_data:
-                    payload["tool_choice"] = request_data["tool_choice"]
-                else:
-                    payload["tool_choice"] = "auto"  # Let model decide when to use tools
-                
-                activity.logger.info(f"Making OpenRouter API call with {len(request_data['tools'])} tools for model: {payload['model']}")
+            if "tools" in payload:
+                activity.logger.info(f"Making OpenRouter API call with {len(payload['tools'])} tools for model: {payload['model']}")
             else:
                 activity.logger.info(f"Making OpenRouter API call for model: {payload['model']}")
             
-            async with httpx.AsyncClient(timeout=settings.openrouter.timeout) as client:
-                response = await client.post(
-                    f"{settings.openrouter.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                
-                if response.status_code != 200:
-                    error_msg = f"OpenRouter API error: {response.status_code} - {response.text}"
-                    activity.logger.error(error_msg)
-                    raise OpenRouterError(error_msg, response.status_code)
-                
-                result = response.json()
-                
-                # Extract the response content
-                if "choices" not in result or not result["choices"]:
-                    error_msg = "No choices in OpenRouter response"
-                    raise OpenRouterError(error_msg)
-                
-                choice = result["choices"][0]
+            client = await _get_client()
+            response = await client.post(
+                completions_url,
+                headers=headers,
+                content=orjson.dumps(payload),
+                timeout=settings.openrouter.timeout
+            )
+            
+            if response.status_code != 200:
+                error = OpenRouterError("OpenRouter API error", response.status_code, response=response)
+                activity.logger.error("%s", error)
+                raise error
+            
+            result = orjson.loads(response.content)
+            
+            # Extract the response content
+            if "choices" not in result or not result["choices"]:
+                error_msg = "No choices in OpenRouter response"
+                raise OpenRouterError(error_msg)
+            
+            response_time = time.monotonic() - start_time
+            responses = []
+            
+            for choice in result["choices"][:n]:
                 message = choice["message"]
-                response_time = time.time() - start_time
                 
                 # Handle tool calls if present
                 tool_calls = message.get("tool_calls", [])
                 has_tool_calls = bool(tool_calls)
                 
-                activity.logger.info(f"OpenRouter API call completed in {response_time:.2f}s, tool calls: {len(tool_calls)}")
-                
-                response_data = {
+                responses.append({
                     "content": message.get("content", ""),
                     "model": result.get("model", model),
                     "usage": result.get("usage", {}),
@@ -119,10 +691,15 @@ class OpenRouterActivities:
                     "has_tool_calls": has_tool_calls,
                     "tool_calls": tool_calls,
                     "message": message  # Include full message for tool calling
-                }
-                
-                return response_data
-                
+                })
+            
+            activity.logger.info(f"OpenRouter API call completed in {response_time:.2f}s, choices: {len(responses)}, tool calls: {sum(len(r['tool_calls']) for r in responses)}")
+            
+            if cache_key is not None:
+                _response_cache_put(cache_key, responses[0])
+            
+            return responses
+            
         except httpx.TimeoutException:
             error_msg = f"OpenRouter API timeout after {settings.openrouter.timeout}s"
             activity.logger.error(error_msg)
@@ -135,6 +712,143 @@ class OpenRouterActivities:
             activity.logger.error(f"Unexpected error in OpenRouter API call: {e}")
             raise
     
+    @staticmethod
+    async def _chat_completion_stream(request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Perform a tool-free chat completion over SSE and return the assembled response
+        
+        Each content delta is reported through an activity heartbeat as it arrives,
+        so progress is visible before the completion finishes.
+        """
+        start_time = time.monotonic()
+        
+        try:
+            # Refresh settings to ensure we have the latest API key
+            settings.refresh_from_database()
+            
+            headers, completions_url = _request_target()
+            payload = _build_chat_payload(request_data, stream=True)
+            model = payload["model"]
+            
+            activity.logger.info(f"Making streaming OpenRouter API call for model: {model}")
+            
+            content_parts: List[str] = []
+            usage = {}
+            response_model = model
+            finish_reason = "stop"
+            heartbeat = activity.heartbeat if activity.in_activity() else None
+            
+            client = await _get_client()
+            async with client.stream(
+                "POST",
+                completions_url,
+                headers=headers,
+                content=orjson.dumps(payload),
+                timeout=settings.openrouter.timeout
+            ) as response:
+                
+                if response.status_code != 200:
+                    error = OpenRouterError("OpenRouter API error", response.status_code, raw_body=await response.aread())
+                    activity.logger.error("%s", error)
+                    raise error
+                
+                async for data in _iter_sse_data(response):
+                    chunk_data, _ = _loads_or_sentinel(data)
+                    if chunk_data is _PARSE_FAILED:
+                        continue
+                    
+                    choices = chunk_data.get("choices")
+                    if not choices:
+                        continue
+                    choice = choices[0]
+                    
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        content_parts.append(content)
+                        if heartbeat is not None:
+                            heartbeat(content)
+                    
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+                        usage = chunk_data.get("usage") or usage
+                        response_model = chunk_data.get("model", response_model)
+            
+            full_content = "".join(content_parts)
+            response_time = time.monotonic() - start_time
+            activity.logger.info(f"Streaming OpenRouter API call completed in {response_time:.2f}s, chunks: {len(content_parts)}")
+            
+            return {
+                "content": full_content,
+                "model": response_model,
+                "usage": usage,
+                "response_time_ms": response_time * 1000,
+                "finish_reason": finish_reason,
+                "streaming": True,
+                "has_tool_calls": False,
+                "tool_calls": [],
+                "message": {"role": "assistant", "content": full_content}
+            }
+            
+        except httpx.TimeoutException:
+            error_msg = f"OpenRouter API timeout after {settings.openrouter.timeout}s"
+            activity.logger.error(error_msg)
+            raise OpenRouterError(error_msg)
+        except httpx.RequestError as e:
+            error_msg = f"OpenRouter API request error: {e}"
+            activity.logger.error(error_msg)
+            raise OpenRouterError(error_msg)
+    
+    @staticmethod
+    @activity.defn
+    async def chat_completion_batched(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several independent chat completions as one batch
+        
+        Identical tool-free requests are sampled in a single API call using the
+        `n` parameter; any other mix of requests is dispatched concurrently.
+        Only batch short, independent prompts (session naming, grading, ...).
+        
+        Args:
+            requests: Chat completion request payloads
+            
+        Returns:
+            One response per request, in request order
+        """
+        return await OpenRouterActivities._run_batch(requests)
+
+    @staticmethod
+    async def _run_batch(
+        requests: List[Dict[str, Any]],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """Dispatch a batch either as one `n` call or as concurrent requests"""
+        if not requests:
+            return []
+        
+        first = requests[0]
+        if len(requests) > 1 and not first.get("tools") and all(r == first for r in requests[1:]):
+            activity.logger.info(f"Batching {len(requests)} identical requests into one call with n={len(requests)}")
+            try:
+                choices = await OpenRouterActivities._chat_completion_choices(first, n=len(requests))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return [e] * len(requests)
+            if len(choices) == len(requests):
+                return choices
+            # Some models ignore `n`; fall back to one call per missing choice
+            activity.logger.warning(f"Requested {len(requests)} choices, received {len(choices)}; completing the rest concurrently")
+            rest = await asyncio.gather(
+                *(OpenRouterActivities.chat_completion(r) for r in requests[len(choices):]),
+                return_exceptions=return_exceptions
+            )
+            return choices + list(rest)
+        
+        return list(await asyncio.gather(
+            *(OpenRouterActivities.chat_completion(r) for r in requests),
+            return_exceptions=return_exceptions
+        ))
+    
     @staticmethod
     @activity.defn
     async def chat_completion_with_tools(
@@ -144,11 +858,7 @@ class OpenRouterActivities:
         """
         Chat completion with explicit tool definitions
         """
-        # Add tools to request data
-        enhanced_request = request_data.copy()
-        enhanced_request["tools"] = tool_schemas
-        
-        return await OpenRouterActivities.chat_completion(enhanced_request)
+        return await OpenRouterActivities.chat_completion(request_data, tools=tool_schemas)
     
     @staticmethod
     @activity.defn
@@ -164,268 +874,211 @@ class OpenRouterActivities:
             # Refresh settings to ensure we have the latest API key
             settings.refresh_from_database()
 
-            # Import event emission functionality
-            import requests
-            import uuid
-
             # Prepare request for streaming
-            headers = {
-                "Authorization": f"Bearer {settings.openrouter.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/your-app/obelisk",
-                "X-Title": "Obelisk Chat Server"
-            }
-            
-            # Use model from request, fallback to settings
-            model = request_data.get("model", settings.openrouter.model)
+            headers, completions_url = _request_target()
             
-            payload = {
-                "model": model,
-                "messages": request_data["messages"],
-                "temperature": request_data.get("temperature", settings.openrouter.temperature),
-                "max_tokens": request_data.get("max_tokens", settings.openrouter.max_tokens),
-                "stream": True
-            }
+            payload = _build_chat_payload(request_data, stream=True)
+            model = payload["model"]
             
-            # Add tool definitions if provided
-            has_tools = False
-            if "tools" in request_data and request_data["tools"]:
-                payload["tools"] = request_data["tools"]
-                if "tool_choice" in request_data:
-                    payload["tool_choice"] = request_data["tool_choice"]
-                else:
-                    payload["tool_choice"] = "auto"
-                has_tools = True
-                
-                activity.logger.info(f"Making streaming OpenRouter API call with {len(request_data['tools'])} tools for model: {payload['model']}")
+            has_tools = "tools" in payload
+            if has_tools:
+                activity.logger.info(f"Making streaming OpenRouter API call with {len(payload['tools'])} tools for model: {payload['model']}")
             else:
                 activity.logger.info(f"Making streaming OpenRouter API call for model: {payload['model']}")
             
             # Generate run ID for this streaming session
-            run_id = f"run-{uuid.uuid4()}"
+            run_id = f"run-{uuid4().hex}"
             full_content = ""
             chunk_count = 0
-            tool_calls_buffer = []  # Buffer for accumulating tool calls
-            current_tool_call = None
+            usage = {}
+            response_model = model
+            tool_calls_buffer: Dict[int, Dict[str, Any]] = {}  # Tool calls being accumulated, by index
+            pending_tool_deltas = []  # Tool call deltas not yet emitted
+            last_tool_emit = 0.0
+            # Wall-clock stamp for streamed events; refreshed every
+            # TIMESTAMP_REFRESH_CHUNKS content chunks and on tool call emits
+            created_at = int(start_time)
             
             # Emit start event
-            start_event = {
-                "event": "RunStarted",
-                "content": "Run started",
-                "content_type": "str",
-                "member_responses": [],
-                "run_id": run_id,
-                "session_id": session_id,
-                "has_tools": has_tools,
-                "created_at": int(time.time())
-            }
+            start_event = _mk_event("RunStarted", "Run started", run_id, session_id, created_at, has_tools=has_tools)
             
-            # Try to emit event to local event server if available
-            try:
-                event_response = requests.post(
-                    "http://localhost:8001/events/emit",
-                    json=start_event,
-                    timeout=1.0
-                )
-            except:
-                pass  # Event emission is optional
+            # Emit event to local event server if available
+            _emit_event(start_event)
             
-            async with httpx.AsyncClient(timeout=settings.openrouter.timeout) as client:
-                async with client.stream(
-                    "POST",
-                    f"{settings.openrouter.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    
-                    if response.status_code != 200:
-                        error_text = await response.aread()
-                        error_msg = f"OpenRouter API error: {response.status_code} - {error_text.decode()}"
-                        activity.logger.error(error_msg)
-                        raise OpenRouterError(error_msg, response.status_code)
-                    
-                    async for line in response.aiter_lines():
-                        if not line.strip():
-                            continue
-                            
-                        if line.startswith("data: "):
-                            data = line[6:].strip()
+            client = await _get_client()
+            async with client.stream(
+                "POST",
+                completions_url,
+                headers=headers,
+                content=orjson.dumps(payload),
+                timeout=settings.openrouter.timeout
+            ) as response:
+                
+                if response.status_code != 200:
+                    # Only pull as much of the error body as the exception will show
+                    error_body = bytearray()
+                    async for piece in response.aiter_bytes():
+                        error_body += piece
+                        if len(error_body) >= OpenRouterError.MAX_BODY_BYTES:
+                            break
+                    error = OpenRouterError("OpenRouter API error", response.status_code, raw_body=bytes(error_body))
+                    activity.logger.error("%s", error)
+                    raise error
+                
+                async for data in _iter_sse_data(response):
+                    try:
+                        chunk_data = orjson.loads(data)
+                        
+                        choices = chunk_data.get("choices")
+                        if choices:
+                            choice = choices[0]
+                            delta = choice.get("delta", {})
                             
-                            if data == "[DONE]":
-                                break
+                            # Handle content streaming
+                            content = delta.get("content", "")
+                            if content:
+                                full_content += content
+                                chunk_count += 1
+                                if chunk_count % TIMESTAMP_REFRESH_CHUNKS == 0:
+                                    created_at = int(time.time())
                                 
-                            try:
-                                chunk_data = json.loads(data)
+                                # Emit real-time chunk event
+                                chunk_event = _mk_event("RunResponse", content, run_id, session_id, created_at)
                                 
-                                if "choices" in chunk_data and chunk_data["choices"]:
-                                    delta = chunk_data["choices"][0].get("delta", {})
+                                # Emit event to local event server
+                                _emit_event(chunk_event)
+                            
+                            # Handle tool calls streaming
+                            if "tool_calls" in delta:
+                                tool_calls = delta["tool_calls"]
+                                new_call_started = False
+                                for tool_call_delta in tool_calls:
+                                    call_index = tool_call_delta.get("index", 0)
+                                    
+                                    buffered_call = tool_calls_buffer.get(call_index)
+                                    if buffered_call is None:
+                                        # Name and arguments are kept as lists of pieces and joined once at the end
+                                        buffered_call = tool_calls_buffer[call_index] = {"id": "", "name": [], "arguments": []}
+                                        new_call_started = True
                                     
-                                    # Handle content streaming
-                                    content = delta.get("content", "")
-                                    if content:
-                                        full_content += content
-                                        chunk_count += 1
-                                        
-                                        # Emit real-time chunk event
-                                        chunk_event = {
-                                            "event": "RunResponse",
-                                            "content": content,
-                                            "content_type": "str",
-                                            "member_responses": [],
-                                            "run_id": run_id,
-                                            "session_id": session_id,
-                                            "created_at": int(time.time())
-                                        }
-                                        
-                                        # Try to emit event to local event server
-                                        try:
-                                            requests.post(
-                                                "http://localhost:8001/events/emit",
-                                                json=chunk_event,
-                                                timeout=0.5
-                                            )
-                                        except:
-                                            pass  # Event emission is optional
+                                    # Update tool call data
+                                    if "id" in tool_call_delta:
+                                        buffered_call["id"] = tool_call_delta["id"]
                                     
-                                    # Handle tool calls streaming
-                                    if "tool_calls" in delta:
-                                        tool_calls = delta["tool_calls"]
-                                        for tool_call_delta in tool_calls:
-                                            call_index = tool_call_delta.get("index", 0)
-                                            
-                                            # Ensure we have enough space in buffer
-                                            while len(tool_calls_buffer) <= call_index:
-                                                tool_calls_buffer.append({
-                                                    "id": "",
-                                                    "type": "function",
-                                                    "function": {"name": "", "arguments": ""}
-                                                })
-                                            
-                                            # Update tool call data
-                                            if "id" in tool_call_delta:
-                                                tool_calls_buffer[call_index]["id"] = tool_call_delta["id"]
-                                            
-                                            if "function" in tool_call_delta:
-                                                func_delta = tool_call_delta["function"]
-                                                if "name" in func_delta and func_delta["name"] is not None:
-                                                    # Ensure the current name is a string before concatenation
-                                                    current_name = tool_calls_buffer[call_index]["function"]["name"]
-                                                    if current_name is None:
-                                                        current_name = ""
-                                                    tool_calls_buffer[call_index]["function"]["name"] = current_name + func_delta["name"]
-                                                if "arguments" in func_delta and func_delta["arguments"] is not None:
-                                                    # Ensure the current arguments is a string before concatenation
-                                                    current_args = tool_calls_buffer[call_index]["function"]["arguments"]
-                                                    if current_args is None:
-                                                        current_args = ""
-                                                    tool_calls_buffer[call_index]["function"]["arguments"] = current_args + func_delta["arguments"]
-                                        
-                                        # Emit tool call event
-                                        try:
-                                            tool_event = {
-                                                "event": "ToolCallsStreaming",
-                                                "content": "Tool calls being constructed",
-                                                "content_type": "tool_calls",
-                                                "tool_calls": tool_calls_buffer,
-                                                "run_id": run_id,
-                                                "session_id": session_id,
-                                                "created_at": int(time.time())
-                                            }
-                                            requests.post(
-                                                "http://localhost:8001/events/emit",
-                                                json=tool_event,
-                                                timeout=0.5
-                                            )
-                                        except:
-                                            pass
-                                        
-                            except json.JSONDecodeError:
-                                activity.logger.warning(f"Failed to parse streaming chunk: {data}")
-                                continue
+                                    name_delta = ""
+                                    args_delta = ""
+                                    func_delta = tool_call_delta.get("function")
+                                    if func_delta:
+                                        name_delta = func_delta.get("name") or ""
+                                        if name_delta:
+                                            buffered_call["name"].append(name_delta)
+                                        args_delta = func_delta.get("arguments") or ""
+                                        if args_delta:
+                                            buffered_call["arguments"].append(args_delta)
+                                    
+                                    pending_tool_deltas.append({
+                                        "index": call_index,
+                                        "id": tool_call_delta.get("id"),
+                                        "name_delta": name_delta,
+                                        "args_delta": args_delta
+                                    })
+                                
+                                # Emit coalesced tool call deltas, at most TOOL_EVENT_INTERVAL apart
+                                # unless a new call just started
+                                now = time.monotonic()
+                                if new_call_started or now - last_tool_emit > TOOL_EVENT_INTERVAL:
+                                    created_at = int(time.time())
+                                    _emit_event(_tool_deltas_event(pending_tool_deltas, run_id, session_id, created_at))
+                                    pending_tool_deltas = []
+                                    last_tool_emit = now
+                            
+                            # Usage and the resolved model only arrive with the final chunk
+                            if choice.get("finish_reason"):
+                                usage = chunk_data.get("usage") or usage
+                                response_model = chunk_data.get("model") or response_model
+                        elif "usage" in chunk_data:
+                            # Some providers send usage in a trailing chunk without choices
+                            usage = chunk_data["usage"] or usage
+                                
+                    except orjson.JSONDecodeError:
+                        activity.logger.warning(f"Failed to parse streaming chunk: {data!r}")
+                        continue
+        
+            # Flush tool call deltas held back by the throttle
+            if pending_tool_deltas:
+                _emit_event(_tool_deltas_event(pending_tool_deltas, run_id, session_id, created_at))
             
             response_time = time.time() - start_time
             
             # Process completed tool calls
             processed_tool_calls = []
-            for i, tool_call in enumerate(tool_calls_buffer):
+            for i, buffered_call in sorted(tool_calls_buffer.items()):
+                name = "".join(buffered_call["name"])
+                args_str = "".join(buffered_call["arguments"])
                 # A valid tool call must have a function name and non-empty arguments
                 # ID can be null in some streaming scenarios, so we don't require it
-                if (tool_call["function"]["name"] and 
-                    tool_call["function"]["arguments"] and 
-                    tool_call["function"]["arguments"].strip()):
-                    try:
-                        # Generate ID if missing
-                        if not tool_call["id"]:
-                            tool_call["id"] = f"call_{str(uuid4())[:12]}"
-                        
-                        # Parse arguments JSON
-                        args_str = tool_call["function"]["arguments"]
-                        if args_str:
-                            tool_call["function"]["arguments"] = json.loads(args_str)
-                        else:
-                            tool_call["function"]["arguments"] = {}
-                        processed_tool_calls.append(tool_call)
-                        activity.logger.info(f"Processed tool call {i}: {tool_call['function']['name']} with args {tool_call['function']['arguments']}")
-                    except json.JSONDecodeError:
-                        activity.logger.warning(f"Failed to parse tool call arguments: {args_str}")
-                        tool_call["function"]["arguments"] = {}
-                        processed_tool_calls.append(tool_call)
-                else:
-                    activity.logger.debug(f"Skipping incomplete tool call {i}: name='{tool_call['function']['name']}', args='{tool_call['function']['arguments']}'")
+                if not (name and args_str.strip()):
+                    activity.logger.debug(f"Skipping incomplete tool call {i}: name='{name}', args='{args_str}'")
+                    continue
+                
+                try:
+                    arguments = orjson.loads(args_str)
+                except orjson.JSONDecodeError:
+                    activity.logger.warning(f"Failed to parse tool call arguments: {args_str}")
+                    arguments = {}
+                
+                tool_call = {
+                    # Generate ID if missing
+                    "id": buffered_call["id"] or f"call_{str(uuid4())[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": arguments}
+                }
+                processed_tool_calls.append(tool_call)
+                activity.logger.info(f"Processed tool call {i}: {name} with args {arguments}")
             
-            # Emit completion event with full metadata
-            completion_event = {
-                "event": "RunCompleted",
-                "content": full_content,
-                "content_type": "str",
-                "model": model,
-                "member_responses": [],
-                "run_id": run_id,
-                "session_id": session_id,
-                "has_tool_calls": len(processed_tool_calls) > 0,
-                "tool_calls": processed_tool_calls,
-                "created_at": int(time.time()),
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": request_data["messages"][-1]["content"] if request_data["messages"] else "",
-                        "from_history": False,
-                        "stop_after_tool_call": False,
-                        "created_at": int(start_time)
-                    },
-                    {
-                        "role": "assistant",
-                        "content": full_content,
-                        "tool_calls": processed_tool_calls if processed_tool_calls else None,
-                        "from_history": False,
-                        "stop_after_tool_call": False,
-                        "metrics": {
-                            "input_tokens": 0,  # Will be populated by actual API response if available
-                            "output_tokens": 0,  # Will be populated by actual API response if available
-                            "total_tokens": 0,   # Will be populated by actual API response if available
-                            "time": response_time,
-                            "time_to_first_token": 0  # Could be calculated if needed
+            # Emit completion event with full metadata; the event (with its
+            # message payload) is only built when it will actually be sent
+            def build_completion_event() -> Dict[str, Any]:
+                return _mk_event(
+                    "RunCompleted", full_content, run_id, session_id, int(time.time()),
+                    model=model,
+                    has_tool_calls=len(processed_tool_calls) > 0,
+                    tool_calls=processed_tool_calls,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": request_data["messages"][-1]["content"] if request_data["messages"] else "",
+                            "from_history": False,
+                            "stop_after_tool_call": False,
+                            "created_at": int(start_time)
                         },
-                        "model": model,
-                        "created_at": int(start_time)
-                    }
-                ]
-            }
-            
-            try:
-                requests.post(
-                    "http://localhost:8001/events/emit",
-                    json=completion_event,
-                    timeout=1.0
+                        {
+                            "role": "assistant",
+                            "content": full_content,
+                            "tool_calls": processed_tool_calls if processed_tool_calls else None,
+                            "from_history": False,
+                            "stop_after_tool_call": False,
+                            "metrics": {
+                                "input_tokens": usage.get("prompt_tokens", 0),
+                                "output_tokens": usage.get("completion_tokens", 0),
+                                "total_tokens": usage.get("total_tokens", 0),
+                                "time": response_time,
+                                "time_to_first_token": 0  # Could be calculated if needed
+                            },
+                            "model": response_model,
+                            "created_at": int(start_time)
+                        }
+                    ]
                 )
-            except:
-                pass  # Event emission is optional
+            
+            _emit_lazy_event(build_completion_event)
             
             activity.logger.info(f"OpenRouter streaming API call completed in {response_time:.2f}s, tool calls: {len(processed_tool_calls)}")
             
             return {
                 "content": full_content,
-                "model": model,
+                "model": response_model,
+                "usage": usage,
                 "response_time_ms": response_time * 1000,
                 "chunk_count": chunk_count,
                 "streaming": True,
@@ -459,82 +1112,79 @@ class OpenRouterActivities:
         Returns:
             Dict with extracted and validated parameters
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             activity.logger.info(f"Extracting parameters from {len(tool_calls)} tool calls")
             
             extracted_calls = []
             validation_errors = []
+            valid_count = 0
             
             for i, tool_call in enumerate(tool_calls):
-                try:
-                    # Extract basic tool call information
-                    call_data = {
-                        "id": tool_call.get("id", f"call_{str(uuid4())[:8]}"),
-                        "type": tool_call.get("type", "function"),
-                        "tool_name": "",
-                        "parameters": {},
+                if not isinstance(tool_call, dict):
+                    validation_errors.append({
+                        "call_index": i,
+                        "error": f"Failed to process tool call: unexpected type {type(tool_call).__name__}",
                         "raw_tool_call": tool_call
-                    }
+                    })
+                    continue
+                
+                # Extract basic tool call information
+                call_data = {
+                    "id": tool_call.get("id") or f"call_{uuid4().hex[:8]}",
+                    "type": tool_call.get("type", "function"),
+                    "tool_name": "",
+                    "parameters": {},
+                    "raw_tool_call": tool_call
+                }
+                
+                # Extract function information
+                function_data = tool_call.get("function")
+                if isinstance(function_data, dict):
+                    call_data["tool_name"] = function_data.get("name", "")
                     
-                    # Extract function information
-                    if "function" in tool_call:
-                        function_data = tool_call["function"]
-                        call_data["tool_name"] = function_data.get("name", "")
-                        
-                        # Parse arguments
-                        arguments = function_data.get("arguments", {})
-                        if isinstance(arguments, str):
-                            try:
-                                call_data["parameters"] = json.loads(arguments)
-                            except json.JSONDecodeError as e:
-                                validation_errors.append({
-                                    "call_index": i,
-                                    "tool_name": call_data["tool_name"],
-                                    "error": f"Failed to parse arguments JSON: {str(e)}",
-                                    "raw_arguments": arguments
-                                })
-                                call_data["parameters"] = {}
-                        elif isinstance(arguments, dict):
-                            call_data["parameters"] = arguments
+                    # Parse arguments; string arguments are the common case
+                    arguments = function_data.get("arguments", {})
+                    if isinstance(arguments, str):
+                        parameters, parse_error = _loads_or_sentinel(arguments)
+                        if parameters is _PARSE_FAILED:
+                            validation_errors.append(_argument_parse_error(i, call_data["tool_name"], arguments, parse_error))
                         else:
-                            validation_errors.append({
-                                "call_index": i,
-                                "tool_name": call_data["tool_name"],
-                                "error": f"Invalid arguments type: {type(arguments)}",
-                                "raw_arguments": arguments
-                            })
-                            call_data["parameters"] = {}
-                    
-                    # Validate required fields
-                    if not call_data["tool_name"]:
+                            call_data["parameters"] = parameters
+                    elif isinstance(arguments, dict):
+                        call_data["parameters"] = arguments
+                    else:
                         validation_errors.append({
                             "call_index": i,
-                            "error": "Missing tool name",
-                            "raw_tool_call": tool_call
+                            "tool_name": call_data["tool_name"],
+                            "error": f"Invalid arguments type: {type(arguments)}",
+                            "raw_arguments": arguments
                         })
-                    
-                    extracted_calls.append(call_data)
-                    
-                except Exception as e:
+                
+                # Validate required fields
+                if call_data["tool_name"]:
+                    valid_count += 1
+                else:
                     validation_errors.append({
                         "call_index": i,
-                        "error": f"Failed to process tool call: {str(e)}",
+                        "error": "Missing tool name",
                         "raw_tool_call": tool_call
                     })
+                
+                extracted_calls.append(call_data)
             
-            extraction_time = time.time() - start_time
+            extraction_time = time.monotonic() - start_time
             
             result = {
                 "success": True,
                 "extracted_calls": extracted_calls,
                 "total_calls": len(tool_calls),
-                "valid_calls": len([call for call in extracted_calls if call["tool_name"]]),
+                "valid_calls": valid_count,
                 "validation_errors": validation_errors,
-                "has_errors": len(validation_errors) > 0,
+                "has_errors": bool(validation_errors),
                 "extraction_time_ms": extraction_time * 1000,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _utc_now_iso()
             }
             
             activity.logger.info(f"Tool call parameter extraction completed: {result['valid_calls']}/{result['total_calls']} valid calls")
@@ -549,8 +1199,8 @@ class OpenRouterActivities:
                 "valid_calls": 0,
                 "validation_errors": [{"error": f"Extraction failed: {str(e)}"}],
                 "has_errors": True,
-                "extraction_time_ms": (time.time() - start_time) * 1000,
-                "timestamp": datetime.utcnow().isoformat()
+                "extraction_time_ms": (time.monotonic() - start_time) * 1000,
+                "timestamp": _utc_now_iso()
             }
     
     @staticmethod
@@ -571,14 +1221,11 @@ class OpenRouterActivities:
         Returns:
             Dict with updated conversation for continuation
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             activity.logger.info(f"Injecting {len(tool_results)} tool results into conversation")
             
-            # Create new conversation with tool results
-            updated_messages = messages.copy()
-            
             # Add the assistant message with tool calls
             assistant_msg = {
                 "role": "assistant",
@@ -589,27 +1236,15 @@ class OpenRouterActivities:
             if assistant_message.get("tool_calls"):
                 assistant_msg["tool_calls"] = assistant_message["tool_calls"]
             
-            updated_messages.append(assistant_msg)
+            # Create new conversation with the assistant message and tool results,
+            # built as one list instead of copy + append
+            updated_messages = [
+                *messages,
+                assistant_msg,
+                *[_tool_result_message(result) for result in tool_results]
+            ]
             
-            # Add tool result messages
-            for result in tool_results:
-                tool_message = {
-                    "role": "tool",
-                    "tool_call_id": result.get("call_id", result.get("tool_call_id")),
-                    "name": result.get("tool_name", "unknown"),
-                    "content": json.dumps(result.get("result", {})) if result.get("result") else ""
-                }
-                
-                # Add error information if tool call failed
-                if not result.get("success", True) and result.get("error"):
-                    tool_message["content"] = json.dumps({
-                        "error": result["error"],
-                        "success": False
-                    })
-                
-                updated_messages.append(tool_message)
-            
-            injection_time = time.time() - start_time
+            injection_time = time.monotonic() - start_time
             
             result = {
                 "success": True,
@@ -618,7 +1253,7 @@ class OpenRouterActivities:
                 "updated_message_count": len(updated_messages),
                 "tool_results_injected": len(tool_results),
                 "injection_time_ms": injection_time * 1000,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _utc_now_iso()
             }
             
             activity.logger.info(f"Tool results injection completed: {len(tool_results)} results injected")
@@ -633,8 +1268,8 @@ class OpenRouterActivities:
                 "updated_message_count": len(messages),
                 "tool_results_injected": 0,
                 "error": str(e),
-                "injection_time_ms": (time.time() - start_time) * 1000,
-                "timestamp": datetime.utcnow().isoformat()
+                "injection_time_ms": (time.monotonic() - start_time) * 1000,
+                "timestamp": _utc_now_iso()
             }
     
     @staticmethod
@@ -655,121 +1290,107 @@ class OpenRouterActivities:
         Returns:
             Dict with continued conversation response
         """
-        start_time = time.time()
+        start_time = time.monotonic()
+        error = None
         
         try:
             activity.logger.info(f"Continuing conversation after tool execution with {len(messages_with_tool_results)} messages")
             
-            # Prepare continuation request
-            continuation_request = {
-                "model": model,
-                "messages": messages_with_tool_results,
-                **(request_options or {})
-            }
-            
-            # Remove tools from continuation to prevent infinite tool calling
-            if "tools" in continuation_request:
-                del continuation_request["tools"]
-            if "tool_choice" in continuation_request:
-                del continuation_request["tool_choice"]
-            
-            # Make the continuation call
-            response = await OpenRouterActivities.chat_completion(continuation_request)
-            
-            continuation_time = time.time() - start_time
-            
-            # Add metadata about continuation
-            response.update({
-                "is_continuation": True,
-                "continuation_after_tools": True,
-                "continuation_time_ms": continuation_time * 1000,
-                "message_count_with_tools": len(messages_with_tool_results)
-            })
-            
-            activity.logger.info(f"Conversation continuation completed in {continuation_time:.2f}s")
-            return response
+            # Prepare continuation request; tools are never carried over so the
+            # continuation cannot start another round of tool calling
+            continuation_request = _build_continuation_request(model, request_options, messages_with_tool_results)
             
+            # Make the continuation call, streaming it when requested
+            if continuation_request.pop("stream", False):
+                response = await OpenRouterActivities._chat_completion_stream(continuation_request)
+            else:
+                response = await OpenRouterActivities.chat_completion(continuation_request)
         except Exception as e:
-            activity.logger.error(f"Failed to continue conversation after tools: {e}")
+            error = e
+        
+        # Measured once for both the success and the error path
+        elapsed_ms = (time.monotonic() - start_time) * 1000
+        
+        if error is not None:
+            activity.logger.error(f"Failed to continue conversation after tools: {error}")
             return {
                 "success": False,
-                "error": str(e),
+                "error": str(error),
                 "is_continuation": True,
                 "continuation_after_tools": True,
-                "continuation_time_ms": (time.time() - start_time) * 1000,
-                "timestamp": datetime.utcnow().isoformat()
+                "continuation_time_ms": elapsed_ms,
+                "timestamp": _utc_now_iso()
             }
+        
+        # Add metadata about continuation
+        response.update({
+            "is_continuation": True,
+            "continuation_after_tools": True,
+            "continuation_time_ms": elapsed_ms,
+            "message_count_with_tools": len(messages_with_tool_results)
+        })
+        
+        activity.logger.info(f"Conversation continuation completed in {elapsed_ms / 1000:.2f}s")
+        return response
 
     @staticmethod
     @activity.defn
     async def health_check() -> Dict[str, Any]:
         """
         Health check for OpenRouter API connectivity
+        
+        Overlapping calls share one in-flight probe and results are reused for
+        HEALTH_CHECK_TTL seconds, so bursts of checks do not stampede /models.
         """
-        try:
-            headers = {
-                "Authorization": f"Bearer {settings.openrouter.api_key}",
-                "Content-Type": "application/json",
-            }
-            
-            # Simple request to check API availability
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{settings.openrouter.base_url}/models",
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    return {
-                        "status": "healthy",
-                        "api_available": True,
-                        "model": settings.openrouter.model,
-                        "timestamp": time.time()
-                    }
-                else:
-                    return {
-                        "status": "unhealthy",
-                        "api_available": False,
-                        "error": f"HTTP {response.status_code}",
-                        "timestamp": time.time()
-                    }
-                    
-        except Exception as e:
-            return {
-                "status": "unhealthy",
-                "api_available": False,
-                "error": str(e),
-                "timestamp": time.time()
-            }
-
+        global _health_inflight, _health_cache
+        cached = _health_cache
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CHECK_TTL:
+            return dict(cached[1])
+        
+        loop = asyncio.get_running_loop()
+        task = _health_inflight
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = _health_inflight = loop.create_task(_probe_health())
+        # Shield the shared probe so one cancelled caller does not cancel it for the rest
+        result = await asyncio.shield(task)
+        _health_cache = (time.monotonic(), result)
+        return dict(result)
+    
     @staticmethod
     @activity.defn
     async def get_models() -> List[Dict[str, Any]]:
         """
         Get available models from OpenRouter API
         """
+        global _models_cache
         try:
             # Refresh settings to ensure we have the latest API key
             settings.refresh_from_database()
-
-            headers = {
-                "Authorization": f"Bearer {settings.openrouter.api_key}",
-                "Content-Type": "application/json",
-            }
+            base_url = settings.openrouter.base_url
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            # Concurrent callers share one upstream request
+            async with _models_lock:
+                cached = _models_cache
+                if cached is not None and cached[0] == base_url and time.monotonic() - cached[1] < MODELS_CACHE_TTL:
+                    return list(cached[2])
+                
+                headers, _ = _request_target()
+                
+                client = await _get_client()
                 response = await client.get(
-                    f"{settings.openrouter.base_url}/models",
-                    headers=headers
+                    f"{base_url}/models",
+                    headers=headers,
+                    timeout=30.0
                 )
                 
                 if response.status_code == 200:
-                    models_data = response.json()
-                    return models_data.get("data", [])
+                    models_data = orjson.loads(response.content).get("data", [])
+                    _models_cache = (base_url, time.monotonic(), models_data)
+                    return list(models_data)
                 else:
                     activity.logger.error(f"Failed to get models: {response.status_code}")
                     raise OpenRouterError(f"Failed to get models: {response.status_code}")
-                    
+                
         except httpx.RequestError as e:
             activity.logger.error(f"Request error getting models: {e}")
             raise OpenRouterError(f"Request error: {e}")
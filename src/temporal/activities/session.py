@@ -2,20 +2,83 @@
 Session Management Activities for Temporal Workflows
 These activities handle session-specific operations like monitoring, cleanup, and lifecycle management.
 """
+import asyncio
 import logging
+import re
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
-import json
-import httpx
 
 from temporalio import activity
 
 from src.database.manager import db_manager
 from src.models.chat import SessionStatus
-from src.config.settings import get_settings
+from src.config.settings import settings
+from src.temporal.activities.openrouter import submit_chat_completion
 
 logger = logging.getLogger(__name__)
 
+METADATA_KEYS_SAMPLE_SIZE = 8  # metadata keys included in session metrics
+ARCHIVAL_CHECKPOINT_INTERVAL = 10  # sessions archived between heartbeats
+ARCHIVAL_MAX_ERRORS = 20  # failed chunks reported before archival gives up
+
+
+# Prompt and request settings for generating session names with Mistral
+SESSION_NAME_SYSTEM_PROMPT = """You are an assistant that creates concise, descriptive titles for chat sessions.
+Given a user's first message, generate a short, clear title (maximum 50 characters) that captures the main topic or intent.
+
+Rules:
+- Maximum 50 characters
+- No quotes or special formatting
+- Descriptive but concise
+- Professional tone
+- Focus on the main topic/intent
+
+Examples:
+User: "How do I deploy a Python app to AWS?"
+Title: "Python AWS Deployment Guide"
+
+User: "I need help with React state management"
+Title: "React State Management Help"
+
+User: "What's the weather like today?"
+Title: "Weather Inquiry"
+"""
+SESSION_NAME_REQUEST = {
+    "model": "mistralai/mistral-small-3.2-24b-instruct:free",
+    "max_tokens": 20,  # Keep it short
+    "temperature": 0.3,  # Lower temperature for more consistent naming
+    "stream": False
+}
+SESSION_NAME_MAX_INPUT_CHARS = 500
+# Messages this short (or short greetings) are titled locally without an LLM call
+SESSION_NAME_SHORT_MESSAGE_CHARS = 30
+SESSION_NAME_GREETING_MAX_CHARS = 60
+_GREETING_RE = re.compile(r"^(hi|hello|hey|yo|sup|thanks?|thank you)\b", re.IGNORECASE)
+
+
+def _fallback_session_name(user_message: str) -> str:
+    """Title made of the message's first words, used when no LLM title is generated"""
+    words = user_message.strip().split()[:4]
+    return " ".join(words)[:50] if words else "New Chat"
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the stored session timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=8)
+def _inactivity_window(timeout_hours: int) -> timedelta:
+    """Inactivity window for a session timeout given in hours"""
+    return timedelta(hours=timeout_hours)
+
+
+@lru_cache(maxsize=8)
+def _archival_cutoff_delta(session_timeout_hours: int) -> timedelta:
+    """Inactivity window before a session is archived: twice the session timeout"""
+    return timedelta(hours=session_timeout_hours * 2)
+
 
 class SessionActivities:
     """Session management activity implementations for Temporal workflows"""
@@ -27,25 +90,23 @@ class SessionActivities:
         Check if a session has been inactive for longer than the specified timeout
         """
         try:
-            session = await db_manager.get_session(session_id)
-            
-            if not session:
-                activity.logger.warning(f"Session not found for inactivity check: {session_id}")
-                return True  # Consider non-existent sessions as inactive
-            
             # Calculate inactivity threshold
-            threshold = datetime.utcnow() - timedelta(hours=timeout_hours)
+            threshold = _utcnow() - _inactivity_window(timeout_hours)
+            
+            # Compare the last update against the threshold in SQL
+            is_inactive = await db_manager.is_session_inactive_since(session_id, threshold)
             
-            # Check if last update was before threshold
-            is_inactive = session.updated_at < threshold if session.updated_at else False
+            if is_inactive is None:
+                activity.logger.warning("Session not found for inactivity check: %s", session_id)
+                return True  # Consider non-existent sessions as inactive
             
             if is_inactive:
-                activity.logger.info(f"Session {session_id} is inactive (last update: {session.updated_at})")
+                activity.logger.info("Session %s is inactive (no update since %s)", session_id, threshold.isoformat())
             
             return is_inactive
             
         except Exception as e:
-            activity.logger.error(f"Failed to check session inactivity {session_id}: {e}")
+            activity.logger.error("Failed to check session inactivity %s: %s", session_id, e)
             return False  # Default to active if check fails
     
     @staticmethod
@@ -54,8 +115,9 @@ class SessionActivities:
         """
         Perform cleanup operations for a session (e.g., old message cleanup, optimization)
         """
+        now = _utcnow()
         try:
-            activity.logger.info(f"Starting cleanup for session: {session_id}")
+            activity.logger.info("Starting cleanup for session: %s", session_id)
             
             # Get session info
             session = await db_manager.get_session(session_id)
@@ -64,7 +126,7 @@ class SessionActivities:
             
             cleanup_results = {
                 "session_id": session_id,
-                "cleanup_time": datetime.now(timezone.utc).isoformat(),
+                "cleanup_time": now.isoformat(),
                 "operations_performed": [],
                 "errors": []
             }
@@ -78,7 +140,7 @@ class SessionActivities:
                     # - Move old messages to an archive table
                     # - Compress message content
                     # - Update session metadata
-                    activity.logger.info(f"Session {session_id} has {session.message_count} messages - considering archival")
+                    activity.logger.info("Session %s has %s messages - considering archival", session_id, session.message_count)
                     cleanup_results["operations_performed"].append("message_count_check")
                 except Exception as e:
                     cleanup_results["errors"].append(f"Message archival error: {e}")
@@ -90,15 +152,15 @@ class SessionActivities:
             except Exception as e:
                 cleanup_results["errors"].append(f"Metadata update error: {e}")
             
-            activity.logger.info(f"Cleanup completed for session {session_id}")
+            activity.logger.info("Cleanup completed for session %s", session_id)
             return cleanup_results
             
         except Exception as e:
-            activity.logger.error(f"Session cleanup failed for {session_id}: {e}")
+            activity.logger.error("Session cleanup failed for %s: %s", session_id, e)
             return {
                 "session_id": session_id,
                 "error": str(e),
-                "cleanup_time": datetime.now(timezone.utc).isoformat()
+                "cleanup_time": now.isoformat()
             }
     
     @staticmethod
@@ -107,6 +169,7 @@ class SessionActivities:
         """
         Log session completion and gather final statistics
         """
+        now = _utcnow()
         try:
             session = await db_manager.get_session(session_id)
             
@@ -114,30 +177,30 @@ class SessionActivities:
                 return {"error": "Session not found", "session_id": session_id}
             
             # Calculate session duration
-            session_duration = datetime.now(timezone.utc) - session.created_at if session.created_at else timedelta(0)
+            session_duration = now - session.created_at if session.created_at else timedelta(0)
             # End of Selection
             
             completion_log = {
                 "session_id": session_id,
-                "completion_time": datetime.now(timezone.utc).isoformat(),
+                "completion_time": now.isoformat(),
                 "session_duration_seconds": session_duration.total_seconds(),
                 "total_messages": session.message_count,
-                "session_status": session.status.value,
+                "session_status": session.status,
                 "created_at": session.created_at.isoformat() if session.created_at else None,
                 "updated_at": session.updated_at.isoformat() if session.updated_at else None
             }
             
-            activity.logger.info(f"Session {session_id} completed: {session.message_count} messages, "
-                               f"{session_duration.total_seconds():.0f}s duration")
+            activity.logger.info("Session %s completed: %s messages, %.0fs duration",
+                                 session_id, session.message_count, session_duration.total_seconds())
             
             return completion_log
             
         except Exception as e:
-            activity.logger.error(f"Failed to log session completion {session_id}: {e}")
+            activity.logger.error("Failed to log session completion %s: %s", session_id, e)
             return {
                 "session_id": session_id,
                 "error": str(e),
-                "completion_time": datetime.now(timezone.utc).isoformat()
+                "completion_time": now.isoformat()
             }
     
     @staticmethod
@@ -147,35 +210,21 @@ class SessionActivities:
         Gather comprehensive metrics for a session
         """
         try:
-            session = await db_manager.get_session(session_id)
+            # Session row and recent message activity are independent reads;
+            # message lengths are aggregated in SQL rather than loaded into Python
+            session, (_, avg_message_length), recent_message_count = await asyncio.gather(
+                db_manager.get_session(session_id),
+                db_manager.get_recent_message_stats(session_id, limit=10),
+                db_manager.get_turn_count(session_id)
+            )
             
             if not session:
                 return {"error": "Session not found", "session_id": session_id}
             
-            # Get recent message activity
-            conversation_history = await db_manager.get_conversation_history(session_id)
-            recent_messages = conversation_history.get('conversation_turns', [])
-            
             # Calculate metrics
-            session_age = datetime.now(timezone.utc) - session.created_at if session.created_at else timedelta(0)
-            last_activity = datetime.now(timezone.utc) - session.updated_at if session.updated_at else timedelta(0)
-            
-            avg_message_length = 0
-            if recent_messages:
-                # Calculate average message length from conversation turns
-                total_length = 0
-                message_count = 0
-                for turn in recent_messages[-10:]:  # Last 10 turns
-                    if 'user_message' in turn:
-                        total_length += len(turn['user_message'].get('content', ''))
-                        message_count += 1
-                    for response in turn.get('assistant_responses', []):
-                        if response.get('is_active', True):
-                            total_length += len(response.get('content', ''))
-                            message_count += 1
-                            break
-                if message_count > 0:
-                    avg_message_length = total_length / message_count
+            now = _utcnow()
+            session_age = now - session.created_at if session.created_at else timedelta(0)
+            last_activity = now - session.updated_at if session.updated_at else timedelta(0)
             
             metrics = {
                 "session_id": session_id,
@@ -183,16 +232,18 @@ class SessionActivities:
                 "last_activity_seconds": last_activity.total_seconds(),
                 "total_messages": session.message_count,
                 "avg_message_length": avg_message_length,
-                "status": session.status.value,
+                "status": session.status,
                 "has_name": session.name is not None,
-                "metadata_keys": list(session.metadata.keys()) if session.metadata else [],
-                "recent_message_count": len(recent_messages)
+                # Bounded preview; the full key list would bloat workflow history
+                "metadata_key_count": len(session.metadata_keys),
+                "metadata_keys_sample": list(session.metadata_keys[:METADATA_KEYS_SAMPLE_SIZE]),
+                "recent_message_count": recent_message_count
             }
             
             return metrics
             
         except Exception as e:
-            activity.logger.error(f"Failed to get session metrics {session_id}: {e}")
+            activity.logger.error("Failed to get session metrics %s: %s", session_id, e)
             return {
                 "session_id": session_id,
                 "error": str(e)
@@ -205,55 +256,57 @@ class SessionActivities:
         Archive sessions that have been inactive for a long time
         """
         try:
-            activity.logger.info(f"Starting batch archival of inactive sessions (max: {max_sessions})")
-            
-            # Get active sessions ordered by last update (oldest first)
-            sessions = await db_manager.list_sessions(
-                offset=0,
-                limit=max_sessions * 2  # Get more to filter
-            )
+            activity.logger.info("Starting batch archival of inactive sessions (max: %s)", max_sessions)
             
-            archived_count = 0
             errors = []
-            settings = get_settings()
-            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=settings.chat.session_timeout_hours * 2)
+            archived_count = 0
             
-            for session in sessions:
-                if archived_count >= max_sessions:
-                    break
-                
-                # Check if session should be archived
-                if (session.status.value == "active" and 
-                    session.updated_at and session.updated_at < cutoff_time and 
-                    session.message_count > 0):
-                    
-                    try:
-                        # Archive the session by updating status directly in database
-                        async with db_manager.get_connection() as connection:
-                            await connection.execute(
-                                "UPDATE sessions SET status = ?, updated_at = ? WHERE session_id = ?",
-                                (SessionStatus.ARCHIVED.value, datetime.now(timezone.utc).isoformat(), session.id)
-                            )
-                            await connection.commit()
-                        
-                        archived_count += 1
-                        activity.logger.debug(f"Archived session: {session.id}")
-                        
-                    except Exception as e:
-                        errors.append(f"Failed to archive session {session.id}: {e}")
+            # Resume from the last checkpoint if a previous attempt was interrupted
+            checkpoint = activity.info().heartbeat_details
+            if checkpoint:
+                archived_count = checkpoint[0]["archived"]
+                cutoff_time = datetime.fromisoformat(checkpoint[0]["cutoff_time"])
+                activity.logger.info("Resuming archival after %s archived sessions", archived_count)
+            else:
+                cutoff_time = _utcnow() - _archival_cutoff_delta(settings.chat.session_timeout_hours)
+            
+            # Only the ids are needed; the archival index serves this query and
+            # sessions archived by an earlier attempt no longer match it
+            to_archive = await db_manager.list_sessions_for_archival(
+                cutoff_time,
+                limit=max(max_sessions - archived_count, 0)
+            )
+            
+            # Archive in chunks, checkpointing progress after each one
+            for start in range(0, len(to_archive), ARCHIVAL_CHECKPOINT_INTERVAL):
+                chunk = to_archive[start:start + ARCHIVAL_CHECKPOINT_INTERVAL]
+                try:
+                    archived_count += await db_manager.bulk_update_session_status(chunk, SessionStatus.ARCHIVED)
+                    activity.logger.debug("Archived sessions: %s", chunk)
+                except Exception as e:
+                    if len(errors) >= ARCHIVAL_MAX_ERRORS:
+                        # The database keeps failing; stop instead of piling up errors
+                        errors.append("...truncated")
+                        break
+                    errors.append(f"Failed to archive {len(chunk)} sessions: {e}")
+                activity.heartbeat({
+                    "archived": archived_count,
+                    "last_id": chunk[-1],
+                    "cutoff_time": cutoff_time.isoformat()
+                })
             
             result = {
                 "archived_count": archived_count,
                 "errors": errors,
                 "cutoff_time": cutoff_time.isoformat(),
-                "total_sessions_checked": len(sessions)
+                "total_sessions_checked": len(to_archive)
             }
             
-            activity.logger.info(f"Batch archival completed: {archived_count} sessions archived")
+            activity.logger.info("Batch archival completed: %s sessions archived", archived_count)
             return result
             
         except Exception as e:
-            activity.logger.error(f"Batch session archival failed: {e}")
+            activity.logger.error("Batch session archival failed: %s", e)
             return {
                 "archived_count": 0,
                 "error": str(e)
@@ -266,9 +319,17 @@ class SessionActivities:
         Validate session data integrity and consistency
         """
         try:
-            session = await db_manager.get_session(session_id)
+            # Start the turn count first so it overlaps the session read and the in-memory checks.
+            # The session is read uncached so both counts come from the same point in time.
+            count_task = asyncio.create_task(db_manager.get_turn_count(session_id))
+            try:
+                session = await db_manager.get_session(session_id)
+            except BaseException:
+                count_task.cancel()
+                raise
             
             if not session:
+                count_task.cancel()
                 return {
                     "session_id": session_id,
                     "valid": False,
@@ -282,38 +343,37 @@ class SessionActivities:
                 "issues_found": []
             }
             
-            # Check 1: Message count consistency
-            conversation_history = await db_manager.get_conversation_history(session_id)
-            actual_turns = conversation_history.get('conversation_turns', [])
-            if len(actual_turns) != session.message_count:
-                validation_results["issues_found"].append(
-                    f"Message count mismatch: session shows {session.message_count}, "
-                    f"actual turn count is {len(actual_turns)}"
-                )
-                validation_results["valid"] = False
-            validation_results["checks_performed"].append("message_count_consistency")
-            
-            # Check 2: Timestamp consistency
+            # Check 1: Timestamp consistency
             if (session.updated_at is not None and session.created_at is not None and 
                 session.updated_at < session.created_at):
                 validation_results["issues_found"].append("Updated timestamp is before created timestamp")
                 validation_results["valid"] = False
             validation_results["checks_performed"].append("timestamp_consistency")
             
-            # Check 3: Status validity
+            # Check 2: Status validity (ChatSession stores the enum's value)
             valid_statuses = ["active", "inactive", "archived"]
-            if session.status.value not in valid_statuses:
-                validation_results["issues_found"].append(f"Invalid status: {session.status.value}")
+            if session.status not in valid_statuses:
+                validation_results["issues_found"].append(f"Invalid status: {session.status}")
                 validation_results["valid"] = False
             validation_results["checks_performed"].append("status_validity")
             
-            activity.logger.info(f"Session validation completed for {session_id}: "
-                               f"{'VALID' if validation_results['valid'] else 'INVALID'}")
+            # Check 3: Message count consistency
+            actual_turn_count = await count_task
+            if actual_turn_count != session.message_count:
+                validation_results["issues_found"].append(
+                    f"Message count mismatch: session shows {session.message_count}, "
+                    f"actual turn count is {actual_turn_count}"
+                )
+                validation_results["valid"] = False
+            validation_results["checks_performed"].append("message_count_consistency")
+            
+            activity.logger.info("Session validation completed for %s: %s",
+                                 session_id, "VALID" if validation_results["valid"] else "INVALID")
             
             return validation_results
             
         except Exception as e:
-            activity.logger.error(f"Session validation failed for {session_id}: {e}")
+            activity.logger.error("Session validation failed for %s: %s", session_id, e)
             return {
                 "session_id": session_id,
                 "valid": False,
@@ -331,47 +391,25 @@ async def generate_session_name(user_message: str) -> str:
     Returns:
         Generated session name (max 50 characters)
     """
+    stripped = user_message.strip()
+    if len(stripped) <= SESSION_NAME_SHORT_MESSAGE_CHARS or (
+        len(stripped) <= SESSION_NAME_GREETING_MAX_CHARS and _GREETING_RE.match(stripped)
+    ):
+        # Nothing to summarize; the first words make an equivalent title
+        return _fallback_session_name(stripped)
+    
     try:
-        from src.temporal.activities.openrouter import OpenRouterActivities
-        
-        # Prepare the prompt for Mistral to generate a session name
-        system_prompt = """You are an assistant that creates concise, descriptive titles for chat sessions. 
-        Given a user's first message, generate a short, clear title (maximum 50 characters) that captures the main topic or intent.
-        
-        Rules:
-        - Maximum 50 characters
-        - No quotes or special formatting
-        - Descriptive but concise
-        - Professional tone
-        - Focus on the main topic/intent
-        
-        Examples:
-        User: "How do I deploy a Python app to AWS?"
-        Title: "Python AWS Deployment Guide"
-        
-        User: "I need help with React state management"
-        Title: "React State Management Help"
-        
-        User: "What's the weather like today?"
-        Title: "Weather Inquiry"
-        """
-        
+        # Only the start of the message matters for a title; cap upstream tokens
         messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Generate a title for this message: {user_message}"}
+            {"role": "system", "content": SESSION_NAME_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Generate a title for this message: {user_message[:SESSION_NAME_MAX_INPUT_CHARS]}"}
         ]
         
         # Use OpenRouter with Mistral model via Temporal activity
         try:
-            request_data = {
-                "messages": messages,
-                "model": "mistralai/mistral-small-3.2-24b-instruct:free",
-                "max_tokens": 20,  # Keep it short
-                "temperature": 0.3,  # Lower temperature for more consistent naming
-                "stream": False
-            }
+            request_data = {**SESSION_NAME_REQUEST, "messages": messages}
             
-            result = await OpenRouterActivities.chat_completion(request_data)
+            result = await submit_chat_completion(request_data)
             
             if result.get("content"):
                 generated_name = result["content"].strip()
@@ -384,31 +422,31 @@ async def generate_session_name(user_message: str) -> str:
                 if len(generated_name) > 50:
                     generated_name = generated_name[:47] + "..."
                 
-                logger.info(f"Generated session name via OpenRouter: {generated_name}")
+                logger.info("Generated session name via OpenRouter: %s", generated_name)
                 return generated_name
             else:
-                logger.error(f"OpenRouter activity failed: No content in response")
+                logger.error("OpenRouter activity failed: No content in response")
                 # Fallback to simple name generation
-                words = user_message.strip().split()[:4]
-                return " ".join(words)[:50] if words else "New Chat"
+                return _fallback_session_name(user_message)
                 
         except Exception as e:
-            logger.error(f"Error calling OpenRouter activity for session naming: {e}")
+            logger.error("Error calling OpenRouter activity for session naming: %s", e)
             # Fallback to simple name generation
-            words = user_message.strip().split()[:4]
-            return " ".join(words)[:50] if words else "New Chat"
+            return _fallback_session_name(user_message)
                 
     except Exception as e:
-        logger.error(f"Error generating session name: {e}")
+        logger.error("Error generating session name: %s", e)
         # Fallback to simple name generation
-        words = user_message.strip().split()[:4]
-        return " ".join(words)[:50] if words else "New Chat"
+        return _fallback_session_name(user_message)
 
 
 @activity.defn
 async def update_session_name_via_api(session_id: str, session_name: str) -> Dict[str, Any]:
     """
-    Update the session name via the API endpoint
+    Update the session name (kept for workflows that still schedule this activity)
+    
+    The worker shares the database with the API server, so this writes
+    directly instead of calling PATCH /sessions/{id}/name over HTTP.
     
     Args:
         session_id: The session ID to update
@@ -417,31 +455,7 @@ async def update_session_name_via_api(session_id: str, session_name: str) -> Dic
     Returns:
         Dictionary with success status and details
     """
-    try:
-        import httpx
-        from src.config.settings import get_settings
-        
-        settings = get_settings()
-        
-        # Call the API endpoint to update session name
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.patch(
-                f"http://{settings.server.host}:{settings.server.port}/sessions/{session_id}/name",
-                json={"name": session_name},
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Updated session {session_id} name via API: {session_name}")
-                return {"success": True, "session_name": session_name, "api_response": result}
-            else:
-                logger.error(f"API error updating session name: {response.status_code} - {response.text}")
-                return {"success": False, "error": f"API error: {response.status_code}"}
-                
-    except Exception as e:
-        logger.error(f"Error updating session name via API: {e}")
-        return {"success": False, "error": str(e)}
+    return await update_session_name_in_db(session_id, session_name)
 
 
 @activity.defn
@@ -457,50 +471,33 @@ async def update_session_name_in_db(session_id: str, session_name: str) -> Dict[
         Dictionary with success status and details
     """
     try:
-        from src.database.manager import db_manager
-        
         # Ensure database is initialized
         await db_manager.initialize()
         
-        # Get current session data
+        # Set the name column and metadata.name in place with JSON1, as the
+        # PATCH /sessions/{id}/name endpoint does; missing session data gets
+        # the default structure and a missing metadata object is created
         async with db_manager.get_connection() as connection:
             cursor = await connection.execute(
-                "SELECT session_data FROM sessions WHERE session_id = ?",
-                (session_id,)
+                """UPDATE sessions
+                   SET name = ?,
+                       session_data = json_set(
+                           coalesce(nullif(session_data, ''), '{"config": {}, "statistics": {}, "metadata": {}}'),
+                           '$.metadata.name', ?
+                       ),
+                       updated_at = ?
+                   WHERE session_id = ?""",
+                (session_name, session_name, _utcnow().isoformat(), session_id)
             )
-            row = await cursor.fetchone()
             
-            if not row:
+            if cursor.rowcount == 0:
                 return {"success": False, "error": "Session not found"}
             
-            # Parse existing session data or create new structure
-            if row['session_data']:
-                session_data = json.loads(row['session_data'])
-            else:
-                session_data = {
-                    "config": {},
-                    "statistics": {},
-                    "metadata": {}
-                }
-            
-            # Ensure metadata exists
-            if "metadata" not in session_data:
-                session_data["metadata"] = {}
-            
-            # Update the session name in metadata
-            session_data["metadata"]["name"] = session_name
-            
-            # Update the session in database
-            await connection.execute(
-                "UPDATE sessions SET session_data = ? WHERE session_id = ?",
-                (json.dumps(session_data), session_id)
-            )
-            
             await connection.commit()
-            
-        logger.info(f"Updated session {session_id} name to: {session_name}")
+        
+        logger.info("Updated session %s name to: %s", session_id, session_name)
         return {"success": True, "session_name": session_name}
         
     except Exception as e:
-        logger.error(f"Error updating session name in database: {e}")
+        logger.error("Error updating session name in database: %s", e)
         return {"success": False, "error": str(e)} 
\ No newline at end of file
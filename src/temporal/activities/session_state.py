@@ -2,57 +2,178 @@
 Temporal activities for session state management
 Handles session-specific tool availability, model capabilities, and configuration
 """
+import asyncio
 import logging
+import re
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from temporalio import activity
 
 from src.database.manager import db_manager
-from src.models.capabilities import ModelCapabilityManager
+from src.models.capabilities import get_capability_manager
 from src.models.session_state import (
     SessionToolStateData, SessionConfiguration, ModelCapabilityInfo,
     ToolAvailabilityInfo, ModelCapabilityLevel, SessionToolState,
-    session_state_manager, update_tool_availability_for_session,
-    record_session_tool_execution
+    CAPABILITY_LEVEL_VALUES, session_state_manager,
+    update_tool_availability_bulk_for_session, record_session_tool_execution
 )
 from src.tools.registry import tool_registry
 
 logger = logging.getLogger(__name__)
 
+MODEL_INFO_CACHE_TTL = 300.0  # seconds a derived model capability is reused
+SESSION_STATE_FLUSH_INTERVAL = 0.5  # seconds tool execution stats are buffered before writing
+SESSION_STATE_MAX_WRITE_ATTEMPTS = 3  # failed flushes of one session before its buffered state is dropped
+
+# Session states with tool executions not yet written; one write per session per flush
+_dirty_session_states: Dict[str, SessionToolStateData] = {}
+# session_id -> consecutive failed flushes of its buffered state
+_session_write_failures: Dict[str, int] = {}
+_session_flush_task: Optional[asyncio.Task] = None
+
+# model_id -> (derived_at monotonic, (supports_tool_calls, capability_level, context_length))
+_model_info_cache: Dict[str, Tuple[float, Tuple[bool, ModelCapabilityLevel, int]]] = {}
+
+_MISSING = object()
+
+# Configuration fields replaced by update_session_tool_configuration, with an optional converter
+_CONFIG_UPDATE_FIELDS = (
+    ("enable_tools", None),
+    ("max_concurrent_tools", None),
+    ("tool_timeout_seconds", None),
+    ("cache_duration_minutes", None),
+    ("allowed_tools", lambda tools: set(tools) if tools else None),
+    ("blocked_tools", set),
+)
+
+# (registry version, enabled tool names in registry order, same names as a set)
+_enabled_tools_cache: Tuple[int, Tuple[str, ...], frozenset] = (-1, (), frozenset())
+
+# Model id patterns checked in order; the first match decides the capability level
+_CAPABILITY_LEVEL_PATTERNS = (
+    (re.compile(r"advanced|gpt-4", re.IGNORECASE), ModelCapabilityLevel.ADVANCED),
+    (re.compile(r"claude-3|gemini", re.IGNORECASE), ModelCapabilityLevel.EXPERT),
+)
+
+
+def _capability_level_for(model_id: str, supports_tool_calls: bool) -> ModelCapabilityLevel:
+    """Determine capability level based on model features"""
+    if not supports_tool_calls:
+        return ModelCapabilityLevel.NONE
+    for pattern, level in _CAPABILITY_LEVEL_PATTERNS:
+        if pattern.search(model_id):
+            return level
+    return ModelCapabilityLevel.BASIC
+
+
+def _enabled_tools() -> Tuple[Tuple[str, ...], frozenset]:
+    """Enabled registry tools, rebuilt only when the registry version changes"""
+    global _enabled_tools_cache
+    version = tool_registry.version
+    if version != _enabled_tools_cache[0]:
+        names = tuple(tool_registry.list_tools(enabled_only=True))
+        _enabled_tools_cache = (version, names, frozenset(names))
+    return _enabled_tools_cache[1], _enabled_tools_cache[2]
+
+
+def _tools_registered(state: SessionToolStateData) -> bool:
+    """Whether every enabled registry tool is registered and unexpired for the session"""
+    if not state.model_info.supports_tool_calls:
+        return True
+    now = datetime.utcnow()
+    available_tools, _ = _enabled_tools()
+    for tool_name in available_tools:
+        info = state.tool_availability.get(tool_name)
+        if info is None or not info.is_available() or (info.cache_expiry is not None and now > info.cache_expiry):
+            return False
+    return True
+
+
+def _build_init_response(state: SessionToolStateData, model_info: ModelCapabilityInfo) -> Dict[str, Any]:
+    return {
+        "session_id": state.session_id,
+        "model_id": model_info.model_id,
+        "supports_tool_calls": model_info.supports_tool_calls,
+        "capability_level": CAPABILITY_LEVEL_VALUES[model_info.capability_level],
+        "available_tools": state.get_available_tools(),
+        "configuration": {
+            "enable_tools": state.session_config.enable_tools,
+            "max_concurrent_tools": state.session_config.max_concurrent_tools,
+            "tool_timeout_seconds": state.session_config.tool_timeout_seconds
+        }
+    }
+
+
+async def _build_model_info(model_id: str) -> ModelCapabilityInfo:
+    """Build capability info for a model, reusing a recent derivation when available"""
+    now = time.monotonic()
+    cached = _model_info_cache.get(model_id)
+    if cached and now - cached[0] < MODEL_INFO_CACHE_TTL:
+        supports_tool_calls, capability_level, context_length = cached[1]
+    else:
+        capability_manager = await get_capability_manager()
+        model_capability = await capability_manager.get_model_capability(model_id)
+        if not model_capability:
+            # Not cached: the lookup also returns None on transient database errors
+            logger.warning(f"No capability information found for model {model_id}")
+            supports_tool_calls, context_length = False, 4096
+            capability_level = ModelCapabilityLevel.NONE
+        else:
+            supports_tool_calls = model_capability.supports_tool_calls
+            context_length = model_capability.context_length or 4096
+            capability_level = _capability_level_for(model_id, supports_tool_calls)
+            _model_info_cache[model_id] = (now, (supports_tool_calls, capability_level, context_length))
+    
+    # A fresh instance per session; the info carries mutable per-session fields
+    return ModelCapabilityInfo(
+        model_id=model_id,
+        supports_tool_calls=supports_tool_calls,
+        capability_level=capability_level,
+        max_tools_per_call=10,  # Default value since ModelCapability doesn't have this field
+        context_length=context_length
+    )
+
+
+def _schedule_session_state_write(session_id: str, session_state: SessionToolStateData) -> None:
+    """Buffer a session state write, coalescing repeated writes for the same session"""
+    global _session_flush_task
+    _dirty_session_states[session_id] = session_state
+    _ensure_session_flush_scheduled()
+
+
+def _ensure_session_flush_scheduled() -> None:
+    global _session_flush_task
+    if _session_flush_task is None:
+        _session_flush_task = asyncio.create_task(_flush_after_interval())
+        _session_flush_task.add_done_callback(_log_session_flush_error)
+
+
+def _log_session_flush_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Session tool state flush failed: {task.exception()}")
+
+
+async def _flush_after_interval() -> None:
+    global _session_flush_task
+    await asyncio.sleep(SESSION_STATE_FLUSH_INTERVAL)
+    # Cleared before writing so executions recorded during the flush schedule another one
+    _session_flush_task = None
+    await flush_session_state_writes()
+
 
 @activity.defn
 async def initialize_session_tool_state(session_id: str, model_id: str) -> Dict[str, Any]:
     """Initialize session tool state for a new session or model change"""
     try:
-        # Get model capability information
-        capability_manager = ModelCapabilityManager()
-        model_capability = await capability_manager.get_model_capability(model_id)
+        # Already initialized for this model with current tool registrations
+        existing_state = await session_state_manager.get_session_state(session_id)
+        if existing_state and existing_state.current_model == model_id and _tools_registered(existing_state):
+            logger.debug(f"Session tool state for {session_id} already initialized with model {model_id}")
+            return _build_init_response(existing_state, existing_state.model_info)
         
-        if not model_capability:
-            logger.warning(f"No capability information found for model {model_id}")
-            model_info = ModelCapabilityInfo(
-                model_id=model_id,
-                supports_tool_calls=False,
-                capability_level=ModelCapabilityLevel.NONE
-            )
-        else:
-            # Determine capability level based on model features
-            capability_level = ModelCapabilityLevel.BASIC
-            if model_capability.supports_tool_calls:
-                if "advanced" in model_id.lower() or "gpt-4" in model_id.lower():
-                    capability_level = ModelCapabilityLevel.ADVANCED
-                elif "claude-3" in model_id.lower() or "gemini" in model_id.lower():
-                    capability_level = ModelCapabilityLevel.EXPERT
-            else:
-                capability_level = ModelCapabilityLevel.NONE
-            
-            model_info = ModelCapabilityInfo(
-                model_id=model_id,
-                supports_tool_calls=model_capability.supports_tool_calls,
-                capability_level=capability_level,
-                max_tools_per_call=10,  # Default value since ModelCapability doesn't have this field
-                context_length=model_capability.context_length or 4096
-            )
+        # Get model capability information
+        model_info = await _build_model_info(model_id)
         
         # Initialize session tool state
         tool_state = await db_manager.initialize_session_tool_state(
@@ -64,26 +185,14 @@ async def initialize_session_tool_state(session_id: str, model_id: str) -> Dict[
         
         # Register available tools for this model
         if model_info.supports_tool_calls:
-            available_tools = tool_registry.list_tools(enabled_only=True)
-            for tool_name in available_tools:
-                await update_tool_availability_for_session(
-                    session_id, tool_name, True
-                )
+            available_tools, _ = _enabled_tools()
+            await update_tool_availability_bulk_for_session(
+                session_id, {tool_name: (True, None) for tool_name in available_tools}
+            )
         
         logger.info(f"Initialized session tool state for {session_id} with model {model_id}")
         
-        return {
-            "session_id": session_id,
-            "model_id": model_id,
-            "supports_tool_calls": model_info.supports_tool_calls,
-            "capability_level": model_info.capability_level.value,
-            "available_tools": tool_state.get_available_tools(),
-            "configuration": {
-                "enable_tools": tool_state.session_config.enable_tools,
-                "max_concurrent_tools": tool_state.session_config.max_concurrent_tools,
-                "tool_timeout_seconds": tool_state.session_config.tool_timeout_seconds
-            }
-        }
+        return _build_init_response(tool_state, model_info)
         
     except Exception as e:
         logger.error(f"Failed to initialize session tool state: {e}")
@@ -94,35 +203,21 @@ async def initialize_session_tool_state(session_id: str, model_id: str) -> Dict[
 async def update_session_model(session_id: str, new_model_id: str) -> Dict[str, Any]:
     """Update session model and invalidate tool cache"""
     try:
-        # Get new model capability information
-        capability_manager = ModelCapabilityManager()
-        model_capability = await capability_manager.get_model_capability(new_model_id)
+        # Switching to the current model with current tool registrations is a no-op
+        current_state = await session_state_manager.get_session_state(session_id)
+        if current_state and current_state.current_model == new_model_id and _tools_registered(current_state):
+            return {
+                "session_id": session_id,
+                "old_model": new_model_id,
+                "new_model": new_model_id,
+                "supports_tool_calls": current_state.model_info.supports_tool_calls,
+                "capability_level": CAPABILITY_LEVEL_VALUES[current_state.model_info.capability_level],
+                "available_tools": current_state.get_available_tools(),
+                "model_switch_count": current_state.model_switch_count
+            }
         
-        if not model_capability:
-            logger.warning(f"No capability information found for model {new_model_id}")
-            new_model_info = ModelCapabilityInfo(
-                model_id=new_model_id,
-                supports_tool_calls=False,
-                capability_level=ModelCapabilityLevel.NONE
-            )
-        else:
-            # Determine capability level
-            capability_level = ModelCapabilityLevel.BASIC
-            if model_capability.supports_tool_calls:
-                if "advanced" in new_model_id.lower() or "gpt-4" in new_model_id.lower():
-                    capability_level = ModelCapabilityLevel.ADVANCED
-                elif "claude-3" in new_model_id.lower() or "gemini" in new_model_id.lower():
-                    capability_level = ModelCapabilityLevel.EXPERT
-            else:
-                capability_level = ModelCapabilityLevel.NONE
-            
-            new_model_info = ModelCapabilityInfo(
-                model_id=new_model_id,
-                supports_tool_calls=model_capability.supports_tool_calls,
-                capability_level=capability_level,
-                max_tools_per_call=10,  # Default value since ModelCapability doesn't have this field
-                context_length=model_capability.context_length or 4096
-            )
+        # Get new model capability information
+        new_model_info = await _build_model_info(new_model_id)
         
         # Update model in session state manager
         updated_state = await session_state_manager.update_model_for_session(
@@ -132,24 +227,20 @@ async def update_session_model(session_id: str, new_model_id: str) -> Dict[str,
         if not updated_state:
             raise ValueError(f"Failed to update model for session {session_id}")
         
-        # Save updated state to database
-        await db_manager.update_session_tool_state(session_id, updated_state)
-        
         # Re-register tools for new model
         if new_model_info.supports_tool_calls:
-            available_tools = tool_registry.list_tools(enabled_only=True)
-            for tool_name in available_tools:
-                await update_tool_availability_for_session(
-                    session_id, tool_name, True
-                )
+            available_tools, _ = _enabled_tools()
+            availability = {tool_name: (True, None) for tool_name in available_tools}
         else:
             # Mark all tools as unavailable for non-tool-calling models
-            current_state = await session_state_manager.get_session_state(session_id)
-            if current_state:
-                for tool_name in current_state.tool_availability.keys():
-                    await update_tool_availability_for_session(
-                        session_id, tool_name, False, "Model does not support tool calling"
-                    )
+            availability = {
+                tool_name: (False, "Model does not support tool calling")
+                for tool_name in updated_state.tool_availability
+            }
+        await update_tool_availability_bulk_for_session(session_id, availability)
+        
+        # Save updated state, including the new tool availability, in one write
+        await db_manager.update_session_tool_state(session_id, updated_state)
         
         logger.info(f"Updated session {session_id} model to {new_model_id}")
         
@@ -158,7 +249,7 @@ async def update_session_model(session_id: str, new_model_id: str) -> Dict[str,
             "old_model": updated_state.current_model if updated_state.last_model_change else None,
             "new_model": new_model_id,
             "supports_tool_calls": new_model_info.supports_tool_calls,
-            "capability_level": new_model_info.capability_level.value,
+            "capability_level": CAPABILITY_LEVEL_VALUES[new_model_info.capability_level],
             "available_tools": updated_state.get_available_tools(),
             "model_switch_count": updated_state.model_switch_count
         }
@@ -185,26 +276,17 @@ async def get_session_tool_availability(session_id: str) -> Dict[str, Any]:
             }
         
         # Build tool availability details
-        tool_availability = {}
-        for tool_name, info in session_state.tool_availability.items():
-            tool_availability[tool_name] = {
-                "state": info.state.value,
-                "is_available": info.is_available(),
-                "is_expired": info.is_expired(),
-                "last_checked": info.last_checked.isoformat(),
-                "cache_expiry": info.cache_expiry.isoformat() if info.cache_expiry else None,
-                "error_message": info.error_message,
-                "execution_count": info.execution_count,
-                "success_count": info.success_count,
-                "success_rate": info.get_success_rate(),
-                "average_execution_time_ms": info.average_execution_time_ms
-            }
+        now = datetime.utcnow()
+        tool_availability = {
+            tool_name: info.to_public_dict(now)
+            for tool_name, info in session_state.tool_availability.items()
+        }
         
         return {
             "session_id": session_id,
             "model_id": session_state.current_model,
             "supports_tool_calls": session_state.model_info.supports_tool_calls,
-            "capability_level": session_state.model_info.capability_level.value,
+            "capability_level": CAPABILITY_LEVEL_VALUES[session_state.model_info.capability_level],
             "available_tools": session_state.get_available_tools(),
             "tool_availability": tool_availability,
             "session_statistics": {
@@ -234,18 +316,10 @@ async def update_session_tool_configuration(session_id: str, config_updates: Dic
             current_config = SessionConfiguration(session_id=session_id)
         
         # Apply updates
-        if "enable_tools" in config_updates:
-            current_config.enable_tools = config_updates["enable_tools"]
-        if "max_concurrent_tools" in config_updates:
-            current_config.max_concurrent_tools = config_updates["max_concurrent_tools"]
-        if "tool_timeout_seconds" in config_updates:
-            current_config.tool_timeout_seconds = config_updates["tool_timeout_seconds"]
-        if "cache_duration_minutes" in config_updates:
-            current_config.cache_duration_minutes = config_updates["cache_duration_minutes"]
-        if "allowed_tools" in config_updates:
-            current_config.allowed_tools = set(config_updates["allowed_tools"]) if config_updates["allowed_tools"] else None
-        if "blocked_tools" in config_updates:
-            current_config.blocked_tools = set(config_updates["blocked_tools"])
+        for field_name, convert in _CONFIG_UPDATE_FIELDS:
+            value = config_updates.get(field_name, _MISSING)
+            if value is not _MISSING:
+                setattr(current_config, field_name, convert(value) if convert else value)
         if "tool_specific_config" in config_updates:
             current_config.tool_specific_config.update(config_updates["tool_specific_config"])
         
@@ -296,37 +370,26 @@ async def refresh_tool_availability_cache(session_id: str, tool_names: Optional[
         # Check if model supports tool calls
         if not session_state.model_info.supports_tool_calls:
             # Mark all tools as unavailable
-            for tool_name in tool_names:
-                await update_tool_availability_for_session(
-                    session_id, tool_name, False, "Model does not support tool calling"
-                )
-                refreshed_tools.append(tool_name)
+            availability = dict.fromkeys(tool_names, (False, "Model does not support tool calling"))
         else:
-            # Refresh each tool's availability
-            available_tools = tool_registry.list_tools(enabled_only=True)
-            
-            for tool_name in tool_names:
-                try:
-                    is_available = tool_name in available_tools
-                    error_message = None if is_available else "Tool not found in registry"
-                    
-                    await update_tool_availability_for_session(
-                        session_id, tool_name, is_available, error_message
-                    )
-                    refreshed_tools.append(tool_name)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to refresh tool {tool_name} for session {session_id}: {e}")
-                    await update_tool_availability_for_session(
-                        session_id, tool_name, False, str(e)
-                    )
-                    failed_tools.append(tool_name)
-        
-        # Update cache refresh count
-        updated_state = await session_state_manager.get_session_state(session_id)
-        if updated_state:
-            updated_state.cache_refresh_count += 1
-            await db_manager.update_session_tool_state(session_id, updated_state)
+            # Partition the requested tools against the cached enabled-tool set
+            _, available_tools = _enabled_tools()
+            requested = frozenset(tool_names)
+            availability = dict.fromkeys(requested & available_tools, (True, None))
+            availability.update(dict.fromkeys(requested - available_tools, (False, "Tool not found in registry")))
+        
+        try:
+            await update_tool_availability_bulk_for_session(session_id, availability)
+            refreshed_tools = list(availability)
+        except Exception as e:
+            logger.error(f"Failed to refresh tools for session {session_id}: {e}")
+            failed_tools = list(availability)
+        
+        # Update cache refresh count and persist it with the refreshed availability
+        # in one write of the state already loaded above
+        session_state.cache_refresh_count += 1
+        if not await db_manager.update_session_tool_state(session_id, session_state):
+            logger.warning(f"Failed to persist refreshed tool availability for session {session_id}")
         
         logger.info(f"Refreshed tool availability cache for session {session_id}: {len(refreshed_tools)} tools")
         
@@ -334,7 +397,7 @@ async def refresh_tool_availability_cache(session_id: str, tool_names: Optional[
             "session_id": session_id,
             "refreshed_tools": refreshed_tools,
             "failed_tools": failed_tools,
-            "refresh_count": updated_state.cache_refresh_count if updated_state else 0,
+            "refresh_count": session_state.cache_refresh_count,
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -348,14 +411,11 @@ async def record_tool_execution_for_session(session_id: str, tool_name: str, suc
     """Record a tool execution for session analytics"""
     try:
         # Record in session state manager
-        await record_session_tool_execution(session_id, tool_name, success, execution_time_ms)
-        
-        # Get updated session state
-        session_state = await session_state_manager.get_session_state(session_id)
+        session_state = await record_session_tool_execution(session_id, tool_name, success, execution_time_ms)
         
         if session_state:
-            # Save updated state to database
-            await db_manager.update_session_tool_state(session_id, session_state)
+            # Save updated state to database with the next coalesced flush
+            _schedule_session_state_write(session_id, session_state)
             
             tool_info = session_state.get_tool_info(tool_name)
             
@@ -415,20 +475,69 @@ async def get_session_tool_statistics(session_id: str) -> Dict[str, Any]:
 async def cleanup_expired_session_states(max_age_hours: int = 24) -> Dict[str, Any]:
     """Clean up expired session states"""
     try:
-        cleaned_count = await session_state_manager.cleanup_expired_sessions(max_age_hours)
-        
-        # Get current statistics
-        all_stats = await session_state_manager.get_all_session_stats()
+        stats = await session_state_manager.cleanup_expired_sessions(max_age_hours)
         
-        logger.info(f"Cleaned up {cleaned_count} expired session states")
+        logger.info(f"Cleaned up {stats.cleaned_sessions} expired session states")
         
         return {
-            "cleaned_sessions": cleaned_count,
-            "remaining_sessions": all_stats["total_sessions"],
-            "active_sessions": all_stats["active_sessions"],
+            "cleaned_sessions": stats.cleaned_sessions,
+            "remaining_sessions": stats.remaining_sessions,
+            "active_sessions": stats.active_sessions,
             "cleanup_timestamp": datetime.utcnow().isoformat()
         }
         
     except Exception as e:
         logger.error(f"Failed to cleanup expired session states: {e}")
-        raise 
\ No newline at end of file
+        raise 
+
+
+@activity.defn
+async def flush_session_state_writes() -> Dict[str, Any]:
+    """Write buffered session tool states to the database"""
+    global _session_flush_task
+    if _session_flush_task is not None and _session_flush_task is not asyncio.current_task():
+        _session_flush_task.cancel()
+        _session_flush_task = None
+    
+    flushed_sessions = 0
+    failed_sessions = []
+    dropped_sessions = []
+    # Entries are taken one at a time, so a failure leaves the rest buffered for the next flush
+    for session_id in list(_dirty_session_states):
+        session_state = _dirty_session_states.pop(session_id, None)
+        if session_state is None:
+            continue
+        try:
+            written = await db_manager.update_session_tool_state(session_id, session_state)
+        except Exception as e:
+            logger.error(f"Failed to flush session tool state for {session_id}: {e}")
+            written = False
+        
+        if written:
+            flushed_sessions += 1
+            _session_write_failures.pop(session_id, None)
+            continue
+        
+        failures = _session_write_failures.get(session_id, 0) + 1
+        if failures < SESSION_STATE_MAX_WRITE_ATTEMPTS:
+            _session_write_failures[session_id] = failures
+            # A newer state buffered during the write takes precedence
+            _dirty_session_states.setdefault(session_id, session_state)
+            failed_sessions.append(session_id)
+        else:
+            _session_write_failures.pop(session_id, None)
+            dropped_sessions.append(session_id)
+    
+    if failed_sessions:
+        logger.warning(f"Failed to flush session tool state for {len(failed_sessions)} sessions; retrying")
+    if dropped_sessions:
+        logger.error(f"Dropped buffered session tool state after {SESSION_STATE_MAX_WRITE_ATTEMPTS} failed writes: {dropped_sessions}")
+    
+    if _dirty_session_states:
+        _ensure_session_flush_scheduled()
+    
+    return {
+        "flushed_sessions": flushed_sessions,
+        "failed_sessions": failed_sessions,
+        "dropped_sessions": dropped_sessions
+    }
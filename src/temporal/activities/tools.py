@@ -8,8 +8,9 @@ and result formatting for conversation history.
 
 import time
 import json
+import asyncio
 import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 from datetime import datetime
 from uuid import uuid4
 
@@ -18,7 +19,7 @@ from temporalio import activity
 from src.tools import tool_registry
 from src.tools.schemas import ToolCall, ToolCallResult, ToolCallStatus, ToolExecutionContext
 from src.tools.exceptions import ToolError, ToolNotFoundError, ToolPermissionError
-from src.models.capabilities import ModelCapabilityManager
+from src.models.capabilities import get_capability_manager
 from src.config.settings import settings
 
 
@@ -31,6 +32,105 @@ class ToolCallingError(Exception):
         super().__init__(self.message)
 
 
+COMPATIBLE_TOOLS_CACHE_TTL = 300.0  # seconds a model's compatible-tool list is reused
+
+# model_id -> (registry version, cached_at monotonic, compatible tool names)
+_compatible_tools_cache: Dict[str, Tuple[int, float, List[str]]] = {}
+# Per-tool data derived from tool definitions; dropped whenever the registry version changes
+_tool_schema_cache: Dict[str, Dict[str, Any]] = {}
+_tool_info_cache: Dict[str, Dict[str, Any]] = {}
+# tool name -> (required parameter names, valid parameter names)
+_tool_param_meta_cache: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+_tool_cache_version = -1
+
+
+def _sync_tool_caches() -> None:
+    """Drop derived tool data built against an older registry version"""
+    global _tool_cache_version
+    if tool_registry.version != _tool_cache_version:
+        _tool_schema_cache.clear()
+        _tool_info_cache.clear()
+        _tool_param_meta_cache.clear()
+        _tool_cache_version = tool_registry.version
+
+
+async def _compatible_tools_for_model(model_id: str) -> List[str]:
+    """Compatible tool names for a model, reused until the registry changes or the TTL passes"""
+    version = tool_registry.version
+    now = time.monotonic()
+    cached = _compatible_tools_cache.get(model_id)
+    if cached and cached[0] == version and now - cached[1] < COMPATIBLE_TOOLS_CACHE_TTL:
+        return cached[2]
+    compatible_tools = await tool_registry.get_tools_for_model(model_id)
+    _compatible_tools_cache[model_id] = (version, now, compatible_tools)
+    return compatible_tools
+
+
+def _tool_schema(tool_name: str) -> Dict[str, Any]:
+    """OpenRouter schema for a registered tool, rendered once per registry version"""
+    _sync_tool_caches()
+    schema = _tool_schema_cache.get(tool_name)
+    if schema is None:
+        schema = _tool_schema_cache[tool_name] = tool_registry.get_tool(tool_name).get_openrouter_schema()
+    return schema
+
+
+def _tool_info(tool_name: str) -> Dict[str, Any]:
+    """Definition details for a registered tool, built once per registry version"""
+    _sync_tool_caches()
+    info = _tool_info_cache.get(tool_name)
+    if info is None:
+        definition = tool_registry.get_tool(tool_name).definition
+        info = _tool_info_cache[tool_name] = {
+            "name": tool_name,
+            "description": definition.description,
+            "parameters": [param.dict() for param in definition.parameters],
+            "version": definition.version,
+            "category": definition.metadata.category,
+            "timeout_seconds": definition.timeout_seconds
+        }
+    return info
+
+
+def _tool_param_meta(tool_name: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Required and valid parameter names for a registered tool, built once per registry version"""
+    _sync_tool_caches()
+    meta = _tool_param_meta_cache.get(tool_name)
+    if meta is None:
+        definition = tool_registry.get_tool(tool_name).definition
+        meta = _tool_param_meta_cache[tool_name] = (
+            frozenset(definition.get_required_parameters()),
+            frozenset(param.name for param in definition.parameters)
+        )
+    return meta
+
+
+async def _model_supports_tools(model_id: str) -> bool:
+    """Tool support from the shared capability cache, without building a full check result"""
+    capability_manager = await get_capability_manager()
+    return await capability_manager.supports_tool_calls(model_id)
+
+
+def _tool_failure_result(call_id: str, tool_name: str, error: Exception, start_time: float) -> Dict[str, Any]:
+    """Failed execute_tool_call result; same shape as a successful one"""
+    return {
+        "call_id": call_id,
+        "tool_name": tool_name,
+        "status": "failed",
+        "success": False,
+        "result": None,
+        "error": {
+            "type": type(error).__name__,
+            "message": str(error),
+            "tool_name": tool_name
+        },
+        "execution_time_ms": 0,
+        "execution_time_seconds": time.time() - start_time,
+        "timestamp": datetime.utcnow().isoformat(),
+        "metadata": {}
+    }
+
+
 class ToolCallingActivities:
     """Tool calling activity implementations for Temporal workflows"""
     
@@ -51,13 +151,12 @@ class ToolCallingActivities:
         try:
             activity.logger.info(f"Checking tool calling support for model: {model_id}")
             
-            # Initialize capability manager if needed
-            capability_manager = ModelCapabilityManager()
-            await capability_manager.initialize()
+            # Shared per worker; initialized and cache-loaded on first use only
+            capability_manager = await get_capability_manager()
             
-            # Check if model supports tool calling
-            supports_tools = await capability_manager.supports_tool_calls(model_id)
+            # Check if model supports tool calling; one cached lookup serves both fields
             model_capability = await capability_manager.get_model_capability(model_id)
+            supports_tools = model_capability.supports_tool_calls if model_capability else False
             
             result = {
                 "model_id": model_id,
@@ -107,8 +206,7 @@ class ToolCallingActivities:
                 tool_registry.initialize()
             
             # Check if model supports tools
-            model_check = await ToolCallingActivities.check_model_tool_support(model_id)
-            if not model_check.get("supports_tool_calls", False):
+            if not await _model_supports_tools(model_id):
                 return {
                     "model_id": model_id,
                     "registration_success": False,
@@ -119,7 +217,7 @@ class ToolCallingActivities:
                 }
             
             # Get compatible tools for this model
-            compatible_tools = await tool_registry.get_tools_for_model(model_id)
+            compatible_tools = await _compatible_tools_for_model(model_id)
             
             if not compatible_tools:
                 return {
@@ -135,21 +233,19 @@ class ToolCallingActivities:
             tool_schemas = []
             registered_tools = []
             
+            # Check permissions for all tools at once if session provided
+            allowed_tools = tool_registry.check_tool_permissions(
+                compatible_tools, session_id, "user", model_id
+            ) if session_id else None
+            
             for tool_name in compatible_tools:
                 try:
-                    # Check permissions if session provided
-                    if session_id:
-                        has_permission = tool_registry.check_tool_permission(
-                            tool_name, session_id, "user", model_id
-                        )
-                        if not has_permission:
-                            activity.logger.warning(f"Tool {tool_name} denied for session {session_id}")
-                            continue
+                    if allowed_tools is not None and tool_name not in allowed_tools:
+                        activity.logger.warning(f"Tool {tool_name} denied for session {session_id}")
+                        continue
                     
-                    # Get tool and generate schema
-                    tool = tool_registry.get_tool(tool_name)
-                    schema = tool.get_openrouter_schema()
-                    tool_schemas.append(schema)
+                    # Get tool schema (rendered once per registry version)
+                    tool_schemas.append(_tool_schema(tool_name))
                     registered_tools.append(tool_name)
                     
                 except Exception as e:
@@ -199,7 +295,7 @@ class ToolCallingActivities:
         """
         start_time = time.time()
         tool_name = tool_call_data.get("tool_name", "unknown")
-        call_id = tool_call_data.get("id", str(uuid4()))
+        call_id = tool_call_data.get("id") or str(uuid4())
         
         try:
             activity.logger.info(f"Executing tool call: {tool_name} (ID: {call_id})")
@@ -249,67 +345,23 @@ class ToolCallingActivities:
             
         except ToolNotFoundError as e:
             activity.logger.error(f"Tool not found: {tool_name}")
-            return {
-                "call_id": call_id,
-                "tool_name": tool_name,
-                "status": "failed",
-                "success": False,
-                "result": None,
-                "error": {
-                    "type": "ToolNotFoundError",
-                    "message": str(e),
-                    "tool_name": tool_name
-                },
-                "execution_time_ms": 0,
-                "execution_time_seconds": time.time() - start_time,
-                "timestamp": datetime.utcnow().isoformat(),
-                "metadata": {}
-            }
+            return _tool_failure_result(call_id, tool_name, e, start_time)
             
         except ToolPermissionError as e:
             activity.logger.error(f"Tool permission denied: {tool_name}")
-            return {
-                "call_id": call_id,
-                "tool_name": tool_name,
-                "status": "failed",
-                "success": False,
-                "result": None,
-                "error": {
-                    "type": "ToolPermissionError",
-                    "message": str(e),
-                    "tool_name": tool_name
-                },
-                "execution_time_ms": 0,
-                "execution_time_seconds": time.time() - start_time,
-                "timestamp": datetime.utcnow().isoformat(),
-                "metadata": {}
-            }
+            return _tool_failure_result(call_id, tool_name, e, start_time)
             
         except Exception as e:
             activity.logger.error(f"Tool execution failed for {tool_name}: {e}")
-            return {
-                "call_id": call_id,
-                "tool_name": tool_name,
-                "status": "failed",
-                "success": False,
-                "result": None,
-                "error": {
-                    "type": type(e).__name__,
-                    "message": str(e),
-                    "tool_name": tool_name
-                },
-                "execution_time_ms": 0,
-                "execution_time_seconds": time.time() - start_time,
-                "timestamp": datetime.utcnow().isoformat(),
-                "metadata": {}
-            }
+            return _tool_failure_result(call_id, tool_name, e, start_time)
     
     @staticmethod
     @activity.defn
     async def execute_multiple_tool_calls(
         tool_calls_data: List[Dict[str, Any]], 
         context_data: Dict[str, Any],
-        max_concurrent: int = 3
+        max_concurrent: int = 3,
+        include_raw: bool = True
     ) -> Dict[str, Any]:
         """
         Execute multiple tool calls concurrently with rate limiting
@@ -318,6 +370,9 @@ class ToolCallingActivities:
             tool_calls_data: List of tool call information
             context_data: Execution context
             max_concurrent: Maximum concurrent executions
+            include_raw: Also return every result in input order under "results";
+                callers that only read the partitioned lists can pass False
+                to halve the payload
             
         Returns:
             Dict with all tool execution results
@@ -327,18 +382,21 @@ class ToolCallingActivities:
         try:
             activity.logger.info(f"Executing {len(tool_calls_data)} tool calls concurrently (max: {max_concurrent})")
             
-            import asyncio
+            # A fixed pool of workers pulls calls from a shared iterator, so at most
+            # max_concurrent executions (and coroutines) exist at any time
+            results: List[Any] = [None] * len(tool_calls_data)
+            pending_calls = iter(enumerate(tool_calls_data))
             
-            # Create semaphore for concurrency control
-            semaphore = asyncio.Semaphore(max_concurrent)
+            async def execute_worker():
+                for index, tool_call_data in pending_calls:
+                    try:
+                        results[index] = await ToolCallingActivities.execute_tool_call(tool_call_data, context_data)
+                    except Exception as e:
+                        results[index] = e
             
-            async def execute_with_semaphore(tool_call_data):
-                async with semaphore:
-                    return await ToolCallingActivities.execute_tool_call(tool_call_data, context_data)
-            
-            # Execute all tool calls concurrently
-            tasks = [execute_with_semaphore(tool_call) for tool_call in tool_calls_data]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Execute tool calls concurrently; results keep the input order
+            worker_count = max(1, min(max_concurrent, len(tool_calls_data)))
+            await asyncio.gather(*(execute_worker() for _ in range(worker_count)))
             
             # Process results
             successful_calls = []
@@ -347,12 +405,13 @@ class ToolCallingActivities:
             for i, result in enumerate(results):
                 if isinstance(result, Exception):
                     # Handle exceptions from individual calls
-                    failed_calls.append({
+                    result = results[i] = {
                         "call_id": tool_calls_data[i].get("id", f"call_{i}"),
                         "tool_name": tool_calls_data[i].get("tool_name", "unknown"),
                         "error": str(result),
                         "status": "failed"
-                    })
+                    }
+                    failed_calls.append(result)
                 elif isinstance(result, dict) and result.get("success", False):
                     successful_calls.append(result)
                 else:
@@ -365,13 +424,15 @@ class ToolCallingActivities:
                 "successful_calls": len(successful_calls),
                 "failed_calls": len(failed_calls),
                 "success_rate": len(successful_calls) / len(tool_calls_data) if tool_calls_data else 0,
-                "results": results,
                 "successful_results": successful_calls,
                 "failed_results": failed_calls,
                 "execution_time_seconds": time.time() - start_time,
                 "timestamp": datetime.utcnow().isoformat(),
                 "max_concurrent": max_concurrent
             }
+            # Same result dicts as the two lists above; left out when the caller opts out
+            if include_raw:
+                execution_summary["results"] = results
             
             activity.logger.info(f"Multiple tool calls completed: {len(successful_calls)}/{len(tool_calls_data)} successful")
             return execution_summary
@@ -412,20 +473,29 @@ class ToolCallingActivities:
         try:
             activity.logger.info(f"Formatting {len(tool_results)} tool results for conversation history")
             
-            # Format each tool call result
+            # Format each tool call result, tallying the turn statistics in the same pass
             formatted_tool_calls = []
+            successful_tool_calls = 0
+            total_execution_time_ms = 0
+            now_iso = datetime.utcnow().isoformat()
             
             for result in tool_results:
+                success = result.get("success", False)
+                execution_time_ms = result.get("execution_time_ms", 0)
+                if success:
+                    successful_tool_calls += 1
+                total_execution_time_ms += execution_time_ms
+                
                 formatted_call = {
-                    "tool_call_id": result.get("call_id", str(uuid4())),
+                    "tool_call_id": result.get("call_id") or str(uuid4()),
                     "tool_name": result.get("tool_name", "unknown"),
                     "status": result.get("status", "unknown"),
                     "arguments": result.get("arguments", {}),
                     "result": result.get("result"),
                     "error": result.get("error"),
-                    "execution_time_ms": result.get("execution_time_ms", 0),
-                    "timestamp": result.get("timestamp", datetime.utcnow().isoformat()),
-                    "success": result.get("success", False)
+                    "execution_time_ms": execution_time_ms,
+                    "timestamp": result.get("timestamp", now_iso),
+                    "success": success
                 }
                 
                 # Add metadata if available
@@ -436,9 +506,9 @@ class ToolCallingActivities:
             
             # Create conversation turn structure
             conversation_turn = {
-                "turn_id": turn_metadata.get("turn_id", f"turn_{str(uuid4())[:8]}"),
+                "turn_id": turn_metadata.get("turn_id") or f"turn_{str(uuid4())[:8]}",
                 "turn_number": turn_metadata.get("turn_number", 1),
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now_iso,
                 "messages": turn_metadata.get("messages", []),
                 "tool_calls": formatted_tool_calls,
                 "metadata": {
@@ -446,9 +516,9 @@ class ToolCallingActivities:
                     "ai_model": turn_metadata.get("ai_model"),
                     "user_id": turn_metadata.get("user_id"),
                     "tool_call_count": len(formatted_tool_calls),
-                    "successful_tool_calls": len([r for r in tool_results if r.get("success", False)]),
-                    "failed_tool_calls": len([r for r in tool_results if not r.get("success", False)]),
-                    "total_execution_time_ms": sum(r.get("execution_time_ms", 0) for r in tool_results),
+                    "successful_tool_calls": successful_tool_calls,
+                    "failed_tool_calls": len(tool_results) - successful_tool_calls,
+                    "total_execution_time_ms": total_execution_time_ms,
                     "formatting_time_ms": (time.time() - start_time) * 1000,
                     **turn_metadata.get("metadata", {})
                 }
@@ -519,38 +589,18 @@ class ToolCallingActivities:
             
             # Get tool and validate parameters
             try:
-                tool = tool_registry.get_tool(tool_name)
-                definition = tool.definition
+                required_params, valid_param_names = _tool_param_meta(tool_name)
                 
                 # Check required parameters
-                required_params = definition.get_required_parameters()
-                missing_params = []
-                
-                for param_name in required_params:
-                    if param_name not in parameters:
-                        missing_params.append(param_name)
-                
+                missing_params = required_params - parameters.keys()
                 if missing_params:
                     validation_results["valid"] = False
-                    validation_results["errors"].append(f"Missing required parameters: {missing_params}")
+                    validation_results["errors"].append(f"Missing required parameters: {sorted(missing_params)}")
                 
                 # Check for unknown parameters
-                valid_param_names = [param.name for param in definition.parameters]
-                unknown_params = []
-                
-                for param_name in parameters.keys():
-                    if param_name not in valid_param_names:
-                        unknown_params.append(param_name)
-                
+                unknown_params = parameters.keys() - valid_param_names
                 if unknown_params:
-                    validation_results["warnings"].append(f"Unknown parameters will be ignored: {unknown_params}")
-                
-                # Validate parameter types (basic validation)
-                for param in definition.parameters:
-                    if param.name in parameters:
-                        value = parameters[param.name]
-                        # Add basic type checking here if needed
-                        pass
+                    validation_results["warnings"].append(f"Unknown parameters will be ignored: {sorted(unknown_params)}")
                 
             except Exception as e:
                 validation_results["valid"] = False
@@ -596,8 +646,7 @@ class ToolCallingActivities:
                 tool_registry.initialize()
             
             # Check model tool support
-            model_check = await ToolCallingActivities.check_model_tool_support(model_id)
-            if not model_check.get("supports_tool_calls", False):
+            if not await _model_supports_tools(model_id):
                 return {
                     "model_id": model_id,
                     "session_id": session_id,
@@ -610,42 +659,21 @@ class ToolCallingActivities:
                 }
             
             # Get compatible tools
-            compatible_tools = await tool_registry.get_tools_for_model(model_id)
+            compatible_tools = await _compatible_tools_for_model(model_id)
             
             # Filter by permissions if session provided
+            allowed_tools = tool_registry.check_tool_permissions(
+                compatible_tools, session_id, "user", model_id
+            ) if session_id else None
+            
             available_tools = []
             for tool_name in compatible_tools:
-                tool_info = {
-                    "name": tool_name,
-                    "description": "",
-                    "parameters": [],
-                    "has_permission": True
-                }
+                if allowed_tools is not None and tool_name not in allowed_tools:
+                    continue  # Skip tools without permission
                 
                 try:
-                    # Get detailed tool info
-                    tool = tool_registry.get_tool(tool_name)
-                    definition = tool.definition
-                    
-                    tool_info.update({
-                        "description": definition.description,
-                        "parameters": [param.dict() for param in definition.parameters],
-                        "version": definition.version,
-                        "category": definition.metadata.category,
-                        "timeout_seconds": definition.timeout_seconds
-                    })
-                    
-                    # Check permissions if session provided
-                    if session_id:
-                        has_permission = tool_registry.check_tool_permission(
-                            tool_name, session_id, "user", model_id
-                        )
-                        tool_info["has_permission"] = has_permission
-                        
-                        if not has_permission:
-                            continue  # Skip tools without permission
-                    
-                    available_tools.append(tool_info)
+                    # Get detailed tool info (built once per registry version)
+                    available_tools.append({**_tool_info(tool_name), "has_permission": True})
                     
                 except Exception as e:
                     activity.logger.warning(f"Failed to get info for tool {tool_name}: {e}")
@@ -6,6 +6,7 @@ from typing import Optional
 from temporalio.client import Client
 
 from src.config.settings import settings
+from src.temporal.converter import orjson_data_converter
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,7 @@ class TemporalClientManager:
             self._client = await Client.connect(
                 target_host=settings.temporal.server_url,
                 namespace=settings.temporal.namespace,
+                data_converter=orjson_data_converter,
                 # tls=TLSConfig() if production else None
             )
             
@@ -0,0 +1,53 @@
+"""
+orjson-backed Temporal data converter for Obelisk
+"""
+import dataclasses
+from typing import Any, Optional
+
+import orjson
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    JSONPlainPayloadConverter,
+)
+
+
+def _orjson_default(value: Any) -> Any:
+    """Encode types orjson does not handle natively"""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError
+
+
+class OrjsonPlainPayloadConverter(JSONPlainPayloadConverter):
+    """JSON plain converter that encodes with orjson
+
+    Payloads keep the json/plain encoding and compact, key-sorted layout of
+    the default converter, so either side can decode them. Values orjson
+    cannot encode fall back to the default encoder.
+    """
+
+    def to_payload(self, value: Any) -> Optional[Payload]:
+        try:
+            data = orjson.dumps(value, default=_orjson_default, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return super().to_payload(value)
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+
+class OrjsonPayloadConverter(CompositePayloadConverter):
+    """Default payload converters with the JSON plain converter swapped for orjson"""
+
+    def __init__(self) -> None:
+        super().__init__(*(
+            OrjsonPlainPayloadConverter() if isinstance(converter, JSONPlainPayloadConverter) else converter
+            for converter in DefaultPayloadConverter.default_encoding_payload_converters
+        ))
+
+
+orjson_data_converter = dataclasses.replace(
+    DataConverter.default,
+    payload_converter_class=OrjsonPayloadConverter,
+)
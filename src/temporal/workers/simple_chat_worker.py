@@ -20,7 +20,9 @@ from src.temporal.workflows.simple_chat import SimpleChatWorkflow, SimpleStreami
 from src.temporal.workflows.tool_execution import ToolExecutionWorkflow, ToolChainWorkflow
 from src.temporal.workflows.dynamic_tools import DynamicToolManagementWorkflow
 from src.temporal.activities.database import DatabaseActivities
-from src.temporal.activities.openrouter import OpenRouterActivities
+from src.temporal.activities.openrouter import OpenRouterActivities, close_completion_batcher, close_http_client
+from src.database.manager import db_manager
+from src.temporal.converter import orjson_data_converter
 from src.temporal.activities.tools import ToolCallingActivities
 from src.temporal.activities.dynamic_tools import DynamicToolActivities
 from src.temporal.activities.session import generate_session_name, update_session_name_in_db, update_session_name_via_api
@@ -28,7 +30,7 @@ from src.temporal.activities.session_state import (
     initialize_session_tool_state, update_session_model, get_session_tool_availability,
     update_session_tool_configuration, refresh_tool_availability_cache,
     record_tool_execution_for_session, get_session_tool_statistics,
-    cleanup_expired_session_states
+    cleanup_expired_session_states, flush_session_state_writes
 )
 
 # Configure logging
@@ -40,7 +42,7 @@ async def start_optimized_chat_worker():
     """Start the optimized chat worker with conversation_turns support and SSE event emission"""
     try:
         # Connect to Temporal
-        client = await Client.connect("localhost:7233")
+        client = await Client.connect("localhost:7233", data_converter=orjson_data_converter)
         logger.info("Connected to Temporal server")
         
         # Create worker with all activities and workflows
@@ -73,6 +75,7 @@ async def start_optimized_chat_worker():
                 
                 # OpenRouter activities  
                 OpenRouterActivities.chat_completion,
+                OpenRouterActivities.chat_completion_batched,
                 OpenRouterActivities.stream_chat,
                 OpenRouterActivities.health_check,
                 OpenRouterActivities.get_models,
@@ -114,6 +117,7 @@ async def start_optimized_chat_worker():
                 record_tool_execution_for_session,
                 # get_session_tool_statistics, # Duplicate - already registered from DatabaseActivities
                 cleanup_expired_session_states,
+                flush_session_state_writes,
             ],
         )
         
@@ -124,7 +128,15 @@ async def start_optimized_chat_worker():
         logger.info("✅ Tool calling support: Advanced tool execution workflows with retries, timeouts, and cancellation")
         logger.info("✅ Dynamic tool registration: Model switching and tool availability management")
         
-        await worker.run()
+        try:
+            await worker.run()
+        finally:
+            # Write buffered session state, finish batched completions, then release
+            # pooled OpenRouter and database connections
+            await flush_session_state_writes()
+            await close_completion_batcher()
+            await close_http_client()
+            await db_manager.close()
         
     except Exception as e:
         logger.error(f"Failed to start worker: {e}")
@@ -63,7 +63,7 @@ class SimpleChatWorkflow:
                 workflow.logger.info(f"Model override requested via config_override: {initial_model}")
             
             # Step 0.6: Get current model from dynamic tool registry (check if session exists)
-            current_session_state = await workflow.execute_activity(
+            current_session_state = await self._execute_read_only_activity(
                 "get_session_tool_state",
                 args=[session_id],
                 start_to_close_timeout=timedelta(seconds=10),
@@ -144,7 +144,7 @@ class SimpleChatWorkflow:
                 
                 # Step 2.6: Re-check session state after registration to get the actual current model
                 # This handles cases where the model was switched in a previous message
-                updated_session_state = await workflow.execute_activity(
+                updated_session_state = await self._execute_read_only_activity(
                     "get_session_tool_state",
                     args=[session_id],
                     start_to_close_timeout=timedelta(seconds=10),
@@ -229,7 +229,7 @@ class SimpleChatWorkflow:
                 workflow.logger.info(f"Processing {len(tool_calls)} tool calls")
                 
                 # Step 5a: Extract tool call parameters
-                tool_extraction = await workflow.execute_activity(
+                tool_extraction = await self._execute_read_only_activity(
                     "extract_tool_call_parameters",
                     args=[tool_calls],
                     start_to_close_timeout=timedelta(seconds=10),
@@ -246,7 +246,7 @@ class SimpleChatWorkflow:
                             tool_name = extracted_call["tool_name"]
                             
                             # Validate tool call against dynamic registry
-                            validation_result = await workflow.execute_activity(
+                            validation_result = await self._execute_read_only_activity(
                                 "validate_tool_call_for_session",
                                 args=[session_id, tool_name],
                                 start_to_close_timeout=timedelta(seconds=5),
@@ -307,7 +307,8 @@ class SimpleChatWorkflow:
                                 "model": model,
                                 "temperature": temperature,
                                 "max_tokens": max_tokens,
-                                "session_id": session_id
+                                "session_id": session_id,
+                                "stream": streaming
                             }
                             
                             final_response = await workflow.execute_activity(
@@ -463,9 +464,14 @@ class SimpleChatWorkflow:
                         retry_policy=retry_policy,
                     )
                     
-                    # Update session name via API
+                    # Update session name directly in the database; histories recorded
+                    # before the change keep the API-backed activity type
+                    if workflow.patched("session-name-direct-db-update"):
+                        update_name_activity = "update_session_name_in_db"
+                    else:
+                        update_name_activity = "update_session_name_via_api"
                     await workflow.execute_activity(
-                        "update_session_name_via_api",
+                        update_name_activity,
                         args=[session_id, session_name],
                         start_to_close_timeout=timedelta(seconds=10),
                         retry_policy=retry_policy,
@@ -535,6 +541,26 @@ class SimpleChatWorkflow:
         
         return openrouter_messages
     
+    async def _execute_read_only_activity(self,
+                                          activity_name: str,
+                                          args: List[Any],
+                                          start_to_close_timeout: timedelta,
+                                          retry_policy: RetryPolicy) -> Any:
+        """Run a short read-only step as a local activity; histories recorded before the change keep the regular activity"""
+        if workflow.patched("local-readonly-activities"):
+            return await workflow.execute_local_activity(
+                activity_name,
+                args=args,
+                start_to_close_timeout=start_to_close_timeout,
+                retry_policy=retry_policy,
+            )
+        return await workflow.execute_activity(
+            activity_name,
+            args=args,
+            start_to_close_timeout=start_to_close_timeout,
+            retry_policy=retry_policy,
+        )
+    
     @workflow.signal
     async def switch_model(self, new_model: str) -> None:
         """Signal to switch the model mid-session"""
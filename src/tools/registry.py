@@ -37,7 +37,13 @@ class ToolRegistry:
         self._default_user_role = "user"
         self._model_capabilities_cache: Dict[str, Dict[str, Any]] = {}
         self._permission_cache: Dict[str, Dict[str, bool]] = {}  # session_id -> tool_name -> allowed
+        self._version = 0  # Bumped whenever the set of registered tools changes
         
+    @property
+    def version(self) -> int:
+        """Registry version, incremented on every register/unregister/reload"""
+        return self._version
+    
     def initialize(self, auto_discover: bool = True, capability_manager=None) -> None:
         """
         Initialize the tool registry with enhanced features
@@ -180,6 +186,7 @@ class ToolRegistry:
         if definition.name not in self._version_registry:
             self._version_registry[definition.name] = {}
         self._version_registry[definition.name][definition.version] = registration
+        self._version += 1
         
         logger.info(f"Registered tool: {definition.name} (v{definition.version})")
     
@@ -215,6 +222,8 @@ class ToolRegistry:
             else:
                 logger.warning(f"Tool version '{tool_name}' v{version} not found")
         
+        self._version += 1
+        
         # Clear caches
         self._clear_tool_caches(tool_name)
     
@@ -417,6 +426,53 @@ class ToolRegistry:
         
         return has_permission
     
+    def check_tool_permissions(self, tool_names: List[str], session_id: str, user_role: Optional[str] = None, model_id: Optional[str] = None) -> Set[str]:
+        """
+        Check permissions for several tools at once
+        
+        Args:
+            tool_names: Names of the tools to check
+            session_id: Session ID
+            user_role: User role (defaults to default_user_role)
+            model_id: Model ID for model-specific restrictions
+            
+        Returns:
+            Set[str]: Names of the permitted tools
+        """
+        if not self._access_control_enabled:
+            return set(tool_names)
+        
+        # Resolved once for the whole batch rather than per tool
+        user_role = user_role or self._default_user_role
+        model_id = model_id or "unknown"
+        cache_key = f"{session_id}:{user_role}:{model_id}"
+        session_cache = self._permission_cache.setdefault(session_id, {})
+        
+        allowed = set()
+        for tool_name in tool_names:
+            registration = self._tools.get(tool_name)
+            if registration is None:
+                continue
+            
+            if tool_name in session_cache:
+                cached_result = session_cache.get(cache_key)
+                if cached_result is not None:
+                    if cached_result:
+                        allowed.add(tool_name)
+                    continue
+            
+            has_permission = registration.has_permission(session_id, user_role, model_id)
+            if has_permission:
+                rate_limits = registration.check_rate_limits(session_id)
+                if rate_limits.get('hourly_exceeded') or rate_limits.get('session_exceeded'):
+                    has_permission = False
+            
+            session_cache[cache_key] = has_permission
+            if has_permission:
+                allowed.add(tool_name)
+        
+        return allowed
+    
     async def execute_tool(self, tool_call: ToolCall, context: ToolExecutionContext) -> ToolCallResult:
         """
         Execute a tool call with enhanced validation and access control
@@ -560,6 +616,7 @@ class ToolRegistry:
         self._tools.clear()
         self._tool_instances.clear()
         self._version_registry.clear()
+        self._version += 1
         
         # Rediscover tools
         self._discover_tools()